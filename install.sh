@@ -119,18 +119,18 @@ else
     fi
 fi
 
-# Check numpy + scipy (for data-analysis/stat_summary.py)
-if python3 -c "import numpy; import scipy" 2>/dev/null; then
-    echo "  [+] numpy + scipy installed (statistical analysis available)"
+# Check numpy + scipy + pandas (for data-analysis/stat_summary.py)
+if python3 -c "import numpy; import scipy; import pandas" 2>/dev/null; then
+    echo "  [+] numpy + scipy + pandas installed (statistical analysis available)"
 else
-    echo "  [-] numpy/scipy not installed (optional, for statistical analysis)"
+    echo "  [-] numpy/scipy/pandas not installed (optional, for statistical analysis)"
     if [ "$MODE" = "full" ] || [ "$MODE" = "" ]; then
-        read -rp "      Install numpy + scipy now? [y/N] " yn
+        read -rp "      Install numpy + scipy + pandas now? [y/N] " yn
         if [[ "${yn:-}" =~ ^[Yy]$ ]]; then
-            python3 -m pip install numpy scipy && echo "  [+] numpy + scipy installed." || echo "  [!] Install failed."
+            python3 -m pip install numpy scipy pandas && echo "  [+] numpy + scipy + pandas installed." || echo "  [!] Install failed."
         fi
     else
-        echo "      Install with: pip install numpy scipy"
+        echo "      Install with: pip install numpy scipy pandas"
     fi
 fi
 
@@ -16,6 +16,7 @@ Usage:
 """
 
 import argparse
+import bisect
 import json
 import os
 import re
@@ -44,6 +45,8 @@ def get_numeric_value_pattern(must_follow: Optional[str] = None,
 NUMERIC_PATTERN = get_numeric_value_pattern(
     must_follow=r'[$,{<=\s\n\(\[]', allow_commas=True
 )
+NUMERIC_RE = re.compile(NUMERIC_PATTERN)
+NUMERIC_BYTES_RE = re.compile(NUMERIC_PATTERN.encode())
 
 
 @dataclass
@@ -65,39 +68,113 @@ def get_hyperlink_pattern(is_target: bool = False) -> str:
     return rf'{command}\{{(?P<reference>[^}}]*)\}}\{{(?P<value>[^}}]*)\}}'
 
 
-def find_references(text: str, is_targets: bool = False) -> list[ReferencedValue]:
-    """Find all hypertarget or hyperlink references in text."""
-    pattern = get_hyperlink_pattern(is_targets)
+TARGET_RE = re.compile(get_hyperlink_pattern(is_target=True))
+LINK_RE = re.compile(get_hyperlink_pattern(is_target=False))
+TARGET_BYTES_RE = re.compile(get_hyperlink_pattern(is_target=True).encode())
+LINK_BYTES_RE = re.compile(get_hyperlink_pattern(is_target=False).encode())
+
+# Either command, so both can be stripped from a document in a single pass.
+HYPERREF_PATTERN = (rf'(?:{re.escape(TARGET)}|{re.escape(LINK)})'
+                    r'\{[^}]*\}\{[^}]*\}')
+HYPERREF_RE = re.compile(HYPERREF_PATTERN)
+HYPERREF_BYTES_RE = re.compile(HYPERREF_PATTERN.encode())
+
+
+def get_hyperlink_re(is_target: bool = False, binary: bool = False) -> re.Pattern:
+    """Get the compiled \\hypertarget or \\hyperlink regex for str or bytes text."""
+    if binary:
+        return TARGET_BYTES_RE if is_target else LINK_BYTES_RE
+    return TARGET_RE if is_target else LINK_RE
+
+
+def as_str(value: str | bytes) -> str:
+    """Decode a matched bytes span; str values are returned unchanged."""
+    if isinstance(value, bytes):
+        return value.decode('utf-8', errors='replace')
+    return value
+
+
+def get_line_starts(text: str | bytes) -> list[int]:
+    """Get the offset of the first character of every line in text."""
+    newline = b'\n' if isinstance(text, bytes) else '\n'
+    line_starts = [0]
+    pos = text.find(newline)
+    while pos != -1:
+        line_starts.append(pos + 1)
+        pos = text.find(newline, pos + 1)
+    return line_starts
+
+
+def iter_hyperlink_commands(text: str | bytes, is_target: bool = False):
+    """Yield (start, reference, value) for each command in text.
+
+    Matches what get_hyperlink_pattern() matches within a single line (a
+    command whose braces span a newline is skipped), but locates the highly
+    selective command literal with find() and splits the two brace groups
+    by hand instead of running the regex engine over every byte.
+    """
+    command = TARGET if is_target else LINK
+    open_brace, close_brace, newline = '{', '}', '\n'
+    if isinstance(text, bytes):
+        command = command.encode()
+        open_brace, close_brace, newline = b'{', b'}', b'\n'
+    pos = text.find(command)
+    while pos != -1:
+        ref_start = pos + len(command) + 1
+        if text[ref_start - 1:ref_start] == open_brace:
+            ref_end = text.find(close_brace, ref_start)
+            if ref_end != -1 and text[ref_end + 1:ref_end + 2] == open_brace:
+                value_end = text.find(close_brace, ref_end + 2)
+                if value_end != -1 and text.find(newline, ref_start, value_end) == -1:
+                    yield pos, text[ref_start:ref_end], text[ref_end + 2:value_end]
+                    pos = text.find(command, value_end + 1)
+                    continue
+        pos = text.find(command, pos + 1)
+
+
+def find_references(text: str | bytes,
+                    is_targets: bool = False) -> list[ReferencedValue]:
+    """Find all hypertarget or hyperlink references in text.
+
+    Accepts raw UTF-8 bytes so large files can be scanned without decoding;
+    only the matched labels and values are decoded.
+    """
+    line_starts = get_line_starts(text)
     refs = []
-    for i, line in enumerate(text.splitlines(), 1):
-        for match in re.finditer(pattern, line):
-            refs.append(ReferencedValue(
-                value=match.group('value'),
-                label=match.group('reference'),
-                is_target=is_targets,
-                line_num=i,
-            ))
+    for start, reference, value in iter_hyperlink_commands(text, is_targets):
+        refs.append(ReferencedValue(
+            value=as_str(value),
+            label=as_str(reference),
+            is_target=is_targets,
+            line_num=bisect.bisect_right(line_starts, start),
+        ))
     return refs
 
 
-def find_numeric_values(text: str, remove_hyperlinks: bool = True) -> list[str]:
+def find_numeric_values(text: str | bytes,
+                        remove_hyperlinks: bool = True) -> list[str]:
     """Find all unreferenced numeric values in text."""
-    text = ' ' + text + ' '
+    binary = isinstance(text, bytes)
+    empty = b'' if binary else ''
+    pad = b' ' if binary else ' '
+    text = pad + text + pad
     if remove_hyperlinks:
-        text = re.sub(get_hyperlink_pattern(is_target=False), '', text)
-        text = re.sub(get_hyperlink_pattern(is_target=True), '', text)
-    return re.findall(NUMERIC_PATTERN, text)
+        text = (HYPERREF_BYTES_RE if binary else HYPERREF_RE).sub(empty, text)
+    if binary:
+        return [as_str(v) for v in NUMERIC_BYTES_RE.findall(text)]
+    return NUMERIC_RE.findall(text)
 
 
-def replace_hyperlinks_with_values(text: str, is_targets: bool = False) -> str:
+def replace_hyperlinks_with_values(text: str | bytes,
+                                   is_targets: bool = False) -> str | bytes:
     """Replace all hypertarget/hyperlink commands with just their values."""
     def replace_match(match):
         return match.group('value')
-    pattern = get_hyperlink_pattern(is_targets)
-    return re.sub(pattern, replace_match, text)
+    pattern = get_hyperlink_re(is_targets, binary=isinstance(text, bytes))
+    return pattern.sub(replace_match, text)
 
 
-def scan_file(tex_content: str) -> dict:
+def scan_file(tex_content: str | bytes) -> dict:
     """Scan a .tex file and report all hypertarget/hyperlink usage."""
     targets = find_references(tex_content, is_targets=True)
     links = find_references(tex_content, is_targets=False)
@@ -115,7 +192,7 @@ def scan_file(tex_content: str) -> dict:
     }
 
 
-def verify_integrity(tex_content: str, code_output: str = "") -> dict:
+def verify_integrity(tex_content: str | bytes, code_output: str = "") -> dict:
     """Verify cross-reference integrity between targets and links."""
     targets = find_references(tex_content, is_targets=True)
     links = find_references(tex_content, is_targets=False)
@@ -153,7 +230,7 @@ def verify_integrity(tex_content: str, code_output: str = "") -> dict:
     code_values = {}
     if code_output:
         for line in code_output.splitlines():
-            m = re.search(get_hyperlink_pattern(is_target=True), line)
+            m = TARGET_RE.search(line)
             if m:
                 code_values[m.group('reference')] = m.group('value')
 
@@ -195,8 +272,14 @@ def main():
                         help="Verify mode: check cross-reference integrity")
     parser.add_argument("--code-output", help="Code output file for cross-referencing")
     parser.add_argument("--output", "-o", help="Output JSON file (default: stdout)")
+    parser.add_argument("--compact", action=argparse.BooleanOptionalAction, default=None,
+                        help="Write compact JSON without indentation "
+                             "(default: on with --output, off for stdout)")
     args = parser.parse_args()
 
+    if args.compact is None:
+        args.compact = bool(args.output)
+
     if not args.scan and not args.verify:
         args.scan = True  # Default to scan mode
 
@@ -204,7 +287,7 @@ def main():
         print(f"Error: {args.tex_file} not found", file=sys.stderr)
         sys.exit(1)
 
-    with open(args.tex_file, encoding="utf-8", errors="replace") as f:
+    with open(args.tex_file, "rb") as f:
         tex_content = f.read()
 
     code_output = ""
@@ -227,13 +310,17 @@ def main():
         if result["code_mismatches"]:
             print(f"  Code mismatches: {len(result['code_mismatches'])}", file=sys.stderr)
 
-    output = json.dumps(result, indent=2, ensure_ascii=False)
+    json_options = {"ensure_ascii": False}
+    if args.compact:
+        json_options["separators"] = (",", ":")
+    else:
+        json_options["indent"] = 2
     if args.output:
         with open(args.output, "w", encoding="utf-8") as f:
-            f.write(output)
+            json.dump(result, f, **json_options)
         print(f"Report written to {args.output}", file=sys.stderr)
     else:
-        print(output)
+        print(json.dumps(result, **json_options))
 
     if args.verify and not result["integrity_ok"]:
         sys.exit(1)
@@ -13,16 +13,20 @@ Usage:
 """
 
 import argparse
+import hashlib
 import json
 import os
 import re
 import sys
+import threading
 import time
 import urllib.error
 import urllib.parse
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 
 S2_API = "https://api.semanticscholar.org/graph/v1/paper/search"
+CACHE_DIR = os.path.expanduser("~/.cache/harvest_citations")
 
 CLAIM_PATTERNS = [
     r"(?:has been shown|have been shown|was shown|were shown|is known|are known)",
@@ -33,12 +37,37 @@ CLAIM_PATTERNS = [
     r"(?:inspired by|motivated by|based on|building on|following)",
     r"(?:\d+\.?\d*)\s*%",  # Numbers that likely need citation
 ]
-
-COMMON_WORDS = {
+# All claim patterns as one alternation; the named group that matched
+# (p0, p1, ...) identifies the pattern.
+CLAIM_RE = re.compile(
+    "|".join(f"(?P<p{i}>{p})" for i, p in enumerate(CLAIM_PATTERNS)),
+    re.IGNORECASE,
+)
+
+# Literal substrings, one of which every CLAIM_PATTERNS match must contain.
+# A cheap `in` check on these skips the regexes for most sentences.
+CLAIM_HINTS = (
+    "shown", "known", "recent", "prior", "previous", "state", "sota",
+    "benchmark", "outperform", "surpass", "exceed", "achieve", "obtain",
+    "report", "demonstrate", "propose", "introduce", "widely", "commonly",
+    "popular", "well-known", "established", "inspired", "motivated",
+    "based on", "building on", "following", "%",
+)
+
+COMMON_WORDS = frozenset({
     "a", "an", "the", "of", "in", "on", "at", "to", "for", "and", "or",
     "is", "are", "was", "were", "be", "been", "with", "from", "by", "as",
     "we", "our", "this", "that", "these", "those", "it", "its",
-}
+})
+
+WORD_RE = re.compile(r"[A-Za-z]+")
+
+# Comments, display math, inline math and \begin/\end markers, removed in
+# one pass; the leftmost construct wins, so a % inside math stays math.
+SANITIZE_RE = re.compile(
+    r"%[^\n]*|\$\$(?s:.*?)\$\$|\$.*?\$|\\(?:begin|end)\{[^}]+\}"
+)
+SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
 
 
 def extract_existing_keys(bib_content: str) -> set[str]:
@@ -55,45 +84,83 @@ def extract_cited_keys(tex_content: str) -> set[str]:
     return keys
 
 
+def iter_sentences(text: str):
+    """Yield the sentences of text lazily, without building a list."""
+    start = 0
+    for match in SENTENCE_SPLIT_RE.finditer(text):
+        yield text[start:match.start()]
+        start = match.end()
+    yield text[start:]
+
+
 def find_uncited_claims(tex_content: str) -> list[dict]:
     """Find sentences with factual claims that lack citations."""
-    # Remove comments
-    text = re.sub(r"%.*$", "", tex_content, flags=re.MULTILINE)
-    # Remove math environments
-    text = re.sub(r"\$\$.*?\$\$", "", text, flags=re.DOTALL)
-    text = re.sub(r"\$.*?\$", "", text)
-    # Remove commands but keep text
-    text = re.sub(r"\\(?:begin|end)\{[^}]+\}", "", text)
-
-    sentences = re.split(r"(?<=[.!?])\s+", text)
+    # Remove comments, math and environment markers but keep text
+    text = SANITIZE_RE.sub("", tex_content)
+
     claims = []
 
-    for sent in sentences:
+    for sent in iter_sentences(text):
         sent = sent.strip()
         if not sent or len(sent) < 30:
             continue
         # Skip if already has a citation
-        if re.search(r"\\cite", sent):
+        if "\\cite" in sent:
+            continue
+        sent_lower = sent.lower()
+        if not any(hint in sent_lower for hint in CLAIM_HINTS):
             continue
         # Check for claim patterns
-        for pattern in CLAIM_PATTERNS:
-            if re.search(pattern, sent, re.IGNORECASE):
-                # Extract key terms for search query
-                words = re.findall(r"[A-Za-z]+", sent)
-                content_words = [w for w in words if w.lower() not in COMMON_WORDS and len(w) > 2]
-                query = " ".join(content_words[:8])
-                claims.append({
-                    "sentence": sent[:200],
-                    "pattern": pattern,
-                    "query": query,
-                })
-                break
+        match = CLAIM_RE.search(sent)
+        if not match:
+            continue
+        # Extract key terms for search query
+        words = WORD_RE.findall(sent)
+        content_words = [w for w in words if len(w) > 2 and w.lower() not in COMMON_WORDS]
+        query = " ".join(content_words[:8])
+        claims.append({
+            "sentence": sent[:200],
+            "pattern": CLAIM_PATTERNS[int(match.lastgroup[1:])],
+            "query": query,
+        })
 
     return claims
 
 
-def search_semantic_scholar(query: str, limit: int = 3, api_key: str = "") -> list[dict]:
-    """Search Semantic Scholar for papers matching the query."""
+class RateLimiter:
+    """Space calls shared across threads to at most `rate` per second."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self.next_time = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_time - now
+            self.next_time = max(now, self.next_time) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+def search_semantic_scholar(query: str, limit: int = 3, api_key: str = "",
+                            use_cache: bool = True,
+                            limiter: RateLimiter | None = None) -> list[dict]:
+    """Search Semantic Scholar for papers matching the query.
+
+    Successful responses are cached on disk under CACHE_DIR, keyed by query
+    and limit, so re-running on the same paper skips the network.
+    """
+    cache_key = hashlib.sha1(f"{query}|{limit}".encode("utf-8")).hexdigest()
+    cache_path = os.path.join(CACHE_DIR, f"{cache_key}.json")
+    if use_cache and os.path.exists(cache_path):
+        try:
+            with open(cache_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+
     params = urllib.parse.urlencode({
         "query": query,
         "limit": limit,
@@ -104,15 +171,28 @@ def search_semantic_scholar(query: str, limit: int = 3, api_key: str = "") -> li
     if api_key:
         headers["x-api-key"] = api_key
 
+    if limiter is not None:
+        limiter.wait()
     try:
         req = urllib.request.Request(url, headers=headers)
         with urllib.request.urlopen(req, timeout=15) as resp:
             data = json.loads(resp.read().decode("utf-8"))
-        return data.get("data", [])
     except Exception as e:
         print(f"  S2 API error: {e}", file=sys.stderr)
         return []
 
+    papers = data.get("data", [])
+    if use_cache:
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            tmp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(papers, f)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"  Cache write failed: {e}", file=sys.stderr)
+    return papers
+
 
 def make_bibtex_key(paper: dict) -> str:
     """Generate a BibTeX key from a Semantic Scholar paper."""
@@ -124,41 +204,46 @@ def make_bibtex_key(paper: dict) -> str:
         family = re.sub(r"[^a-zA-Z]", "", parts[-1]) if parts else ""
     year = str(paper.get("year", ""))
     title = paper.get("title", "")
-    title_words = re.findall(r"[A-Za-z]+", title)
+    title_words = WORD_RE.findall(title)
     content_words = [w.lower() for w in title_words if w.lower() not in COMMON_WORDS]
     title_part = content_words[0] if content_words else ""
     return family.lower() + year + title_part
 
 
+INPROCEEDINGS_TEMPLATE = (
+    "@inproceedings{{{key},\n"
+    "  author = {{{authors}}},\n"
+    "  title = {{{title}}},\n"
+    "  booktitle = {{{venue}}},\n"
+    "  year = {{{year}}},\n"
+    "{doi_line}}}"
+)
+ARTICLE_TEMPLATE = (
+    "@article{{{key},\n"
+    "  author = {{{authors}}},\n"
+    "  title = {{{title}}},\n"
+    "  year = {{{year}}},\n"
+    "{doi_line}}}"
+)
+
+
 def paper_to_bibtex(paper: dict, key: str) -> str:
     """Convert a Semantic Scholar paper to a BibTeX entry."""
-    title = paper.get("title", "")
-    authors = " and ".join(a.get("name", "") for a in paper.get("authors", []))
-    year = str(paper.get("year", ""))
     venue = paper.get("venue", "")
     doi = ""
     ext_ids = paper.get("externalIds", {})
     if ext_ids:
         doi = ext_ids.get("DOI", "")
 
-    if venue:
-        entry_type = "inproceedings"
-        lines = [f"@inproceedings{{{key},"]
-        lines.append(f"  author = {{{authors}}},")
-        lines.append(f"  title = {{{title}}},")
-        lines.append(f"  booktitle = {{{venue}}},")
-        lines.append(f"  year = {{{year}}},")
-    else:
-        entry_type = "article"
-        lines = [f"@article{{{key},"]
-        lines.append(f"  author = {{{authors}}},")
-        lines.append(f"  title = {{{title}}},")
-        lines.append(f"  year = {{{year}}},")
-
-    if doi:
-        lines.append(f"  doi = {{{doi}}},")
-    lines.append("}")
-    return "\n".join(lines)
+    template = INPROCEEDINGS_TEMPLATE if venue else ARTICLE_TEMPLATE
+    return template.format(
+        key=key,
+        authors=" and ".join(a.get("name", "") for a in paper.get("authors", [])),
+        title=paper.get("title", ""),
+        venue=venue,
+        year=str(paper.get("year", "")),
+        doi_line=f"  doi = {{{doi}}},\n" if doi else "",
+    )
 
 
 def main():
@@ -168,6 +253,10 @@ def main():
     parser.add_argument("--output", "-o", help="Output .bib file for candidates")
     parser.add_argument("--max-rounds", type=int, default=10, help="Max harvesting rounds (default: 10)")
     parser.add_argument("--api-key", default="", help="Semantic Scholar API key")
+    parser.add_argument("--workers", type=int, default=5,
+                        help="Concurrent Semantic Scholar requests (default: 5)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help=f"Ignore cached Semantic Scholar responses in {CACHE_DIR}")
     parser.add_argument("--dry-run", action="store_true", help="Only show claims, don't search")
     parser.add_argument("--verbose", action="store_true", help="Print detailed progress")
     args = parser.parse_args()
@@ -201,10 +290,24 @@ def main():
     used_keys = set(existing_keys)
     rounds = min(len(claims), args.max_rounds)
 
+    # Requests run concurrently but share one rate limit (S2 allows more
+    # requests per second with an API key); cache hits are not throttled.
+    limiter = RateLimiter(5 if args.api_key else 1)
+
+    def search(query: str) -> list[dict]:
+        return search_semantic_scholar(query, limit=3, api_key=args.api_key,
+                                       use_cache=not args.no_cache, limiter=limiter)
+
+    # Claims often reduce to the same query; search each distinct one once
+    queries = list(dict.fromkeys(c["query"] for c in claims[:rounds]))
+    print(f"Searching Semantic Scholar for {rounds} claims "
+          f"({len(queries)} distinct queries)...", file=sys.stderr)
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        results = dict(zip(queries, executor.map(search, queries)))
+
     for i, claim in enumerate(claims[:rounds]):
-        print(f"\n[{i+1}/{rounds}] Searching for: {claim['query'][:60]}...", file=sys.stderr)
-        papers = search_semantic_scholar(claim["query"], limit=3, api_key=args.api_key)
-        time.sleep(1)  # Rate limiting
+        papers = results[claim["query"]]
+        print(f"\n[{i+1}/{rounds}] Searched for: {claim['query'][:60]}...", file=sys.stderr)
 
         if not papers:
             if args.verbose:
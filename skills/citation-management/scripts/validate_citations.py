@@ -13,25 +13,52 @@ Usage:
 """
 
 import argparse
-import glob
 import os
 import re
 import sys
-
-
-def extract_cite_keys(tex_content: str) -> list[str]:
-    """Extract all citation keys from LaTeX content."""
-    # Match \cite{}, \citep{}, \citet{}, \citeauthor{}, etc.
-    pattern = r"\\cite[a-z]*\{([^}]*)\}"
-    matches = re.findall(pattern, tex_content)
-    keys = []
-    for match in matches:
-        # Handle multiple keys in one \cite{key1, key2}
-        for key in match.split(","):
-            key = key.strip()
-            if key:
-                keys.append(key)
-    return keys
+from collections import Counter
+
+
+# One pass over the tex for every command we check. Each branch sits in a
+# lookahead after the shared backslash, so matches never swallow a nested
+# command (e.g. a \label inside a \section title). The pattern is bytes so
+# tex files can be scanned without decoding them first.
+TEX_COMMAND_RE = re.compile(
+    rb"\\(?="
+    rb"cite[a-z]*\{(?P<cite>[^}]*)\}"
+    rb"|includegraphics(?:\[.*?\])?\{(?P<figure>[^}]*)\}"
+    rb"|label\{(?P<label>[^}]*)\}"
+    rb"|(?:c?C?ref|autoref|eqref)\{(?P<ref>[^}]*)\}"
+    rb"|section\{(?P<section>[^}]*)\}"
+    rb")"
+)
+
+EMBEDDED_BIB_RE = re.compile(
+    rb"\\begin\{filecontents\}\{references\.bib\}(.*?)\\end\{filecontents\}",
+    re.DOTALL,
+)
+
+
+def extract_tex_items(tex_content: bytes) -> dict:
+    """Extract citation keys, figures, labels, refs and sections in one scan.
+
+    Takes the raw UTF-8 tex bytes; only the matched arguments are decoded.
+    Citation keys are returned as a Counter of uses per key, the rest as
+    lists in document order.
+    """
+    items = {"cite": Counter(), "figure": [], "label": [], "ref": [], "section": []}
+    for match in TEX_COMMAND_RE.finditer(tex_content):
+        kind = match.lastgroup
+        value = match.group(kind).decode("utf-8", errors="replace")
+        if kind == "cite":
+            # Handle multiple keys in one \cite{key1, key2}
+            for key in value.split(","):
+                key = key.strip()
+                if key:
+                    items["cite"][key] += 1
+        else:
+            items[kind].append(value)
+    return items
 
 
 def extract_bib_keys(bib_content: str) -> list[str]:
@@ -41,36 +68,29 @@ def extract_bib_keys(bib_content: str) -> list[str]:
     return [m.strip() for m in matches]
 
 
-def extract_figure_refs(tex_content: str) -> list[str]:
-    """Extract all included graphics filenames."""
-    pattern = r"\\includegraphics(?:\[.*?\])?\{([^}]*)\}"
-    return re.findall(pattern, tex_content)
-
-
-def extract_labels(tex_content: str) -> list[str]:
-    """Extract all \\label{} definitions."""
-    pattern = r"\\label\{([^}]*)\}"
-    return re.findall(pattern, tex_content)
-
-
-def extract_refs(tex_content: str) -> list[str]:
-    """Extract all \\ref{} and \\cref{} references."""
-    pattern = r"\\(?:c?C?ref|autoref|eqref)\{([^}]*)\}"
-    return re.findall(pattern, tex_content)
-
+def iter_tex_files(root: str):
+    """Yield .tex files under root, like glob("**/*.tex") but via os.scandir.
 
-def extract_sections(tex_content: str) -> list[str]:
-    """Extract all \\section{} headers."""
-    pattern = r"\\section\{([^}]*)\}"
-    return re.findall(pattern, tex_content)
+    Files in a directory come before those in its subdirectories; hidden
+    entries are skipped as glob does.
+    """
+    stack = [root]
+    while stack:
+        subdirs = []
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.name.endswith(".tex") and entry.is_file():
+                    yield entry.path
+        stack.extend(reversed(subdirs))
 
 
 def find_duplicates(items: list[str]) -> dict[str, int]:
     """Find items that appear more than once."""
-    counts = {}
-    for item in items:
-        counts[item] = counts.get(item, 0) + 1
-    return {k: v for k, v in counts.items() if v > 1}
+    return {k: v for k, v in Counter(items).items() if v > 1}
 
 
 def main():
@@ -88,138 +108,141 @@ def main():
     if args.tex:
         tex_files = [args.tex]
     elif args.tex_dir:
-        tex_files = glob.glob(os.path.join(args.tex_dir, "**/*.tex"), recursive=True)
+        tex_files = list(iter_tex_files(args.tex_dir))
     else:
         print("Error: must specify --tex or --tex-dir", file=sys.stderr)
         sys.exit(1)
 
-    all_tex = ""
+    tex_parts = []
     for tf in tex_files:
-        with open(tf, encoding="utf-8", errors="replace") as f:
-            all_tex += f.read() + "\n"
+        with open(tf, "rb") as f:
+            tex_parts.append(f.read())
+    tex_parts.append(b"")
+    all_tex = b"\n".join(tex_parts)
 
-    # Load bib content
-    with open(args.bib, encoding="utf-8", errors="replace") as f:
-        bib_content = f.read()
+    # Load bib content; the raw bytes are kept for --fix
+    with open(args.bib, "rb") as f:
+        bib_bytes = f.read()
+    bib_content = bib_bytes.decode("utf-8", errors="replace")
 
     # Also check for embedded bib in filecontents
-    embedded_bib = re.search(
-        r"\\begin\{filecontents\}\{references\.bib\}(.*?)\\end\{filecontents\}",
-        all_tex, re.DOTALL
-    )
+    embedded_bib = EMBEDDED_BIB_RE.search(all_tex)
     if embedded_bib:
-        bib_content += "\n" + embedded_bib.group(1)
+        bib_content += "\n" + embedded_bib.group(1).decode("utf-8", errors="replace")
 
-    cite_keys = extract_cite_keys(all_tex)
+    tex_items = extract_tex_items(all_tex)
+    cite_counts = tex_items["cite"]
     bib_keys = extract_bib_keys(bib_content)
 
-    cite_set = set(cite_keys)
-    bib_set = set(bib_keys)
+    bib_counts = Counter(bib_keys)
+    cite_set = set(cite_counts)
+    bib_set = set(bib_counts)
 
+    # The report is collected and written in one go at the end
+    report = []
+    emit = report.append
     issues = 0
 
     # 1. Missing citations
     missing = cite_set - bib_set
     if missing:
-        print(f"\n## MISSING CITATIONS ({len(missing)})")
-        print("These \\cite{{key}} are used in .tex but not defined in .bib:")
+        emit(f"\n## MISSING CITATIONS ({len(missing)})")
+        emit("These \\cite{{key}} are used in .tex but not defined in .bib:")
         for key in sorted(missing):
-            count = cite_keys.count(key)
-            print(f"  - {key} (used {count}x)")
+            emit(f"  - {key} (used {cite_counts[key]}x)")
         issues += len(missing)
 
     # 2. Unused bib entries
     unused = bib_set - cite_set
     if unused:
-        print(f"\n## UNUSED BIB ENTRIES ({len(unused)})")
-        print("These entries are in .bib but never cited:")
+        emit(f"\n## UNUSED BIB ENTRIES ({len(unused)})")
+        emit("These entries are in .bib but never cited:")
         for key in sorted(unused):
-            print(f"  - {key}")
+            emit(f"  - {key}")
 
     # 3. Duplicate bib keys
-    dup_bib = find_duplicates(extract_bib_keys(bib_content))
+    dup_bib = {k: v for k, v in bib_counts.items() if v > 1}
     if dup_bib:
-        print(f"\n## DUPLICATE BIB KEYS ({len(dup_bib)})")
+        emit(f"\n## DUPLICATE BIB KEYS ({len(dup_bib)})")
         for key, count in sorted(dup_bib.items()):
-            print(f"  - {key} (defined {count}x)")
+            emit(f"  - {key} (defined {count}x)")
         issues += len(dup_bib)
 
     # 4. Duplicate section headers
-    sections = extract_sections(all_tex)
+    sections = tex_items["section"]
     dup_sections = find_duplicates(sections)
     if dup_sections:
-        print(f"\n## DUPLICATE SECTIONS ({len(dup_sections)})")
+        emit(f"\n## DUPLICATE SECTIONS ({len(dup_sections)})")
         for sec, count in sorted(dup_sections.items()):
-            print(f"  - \\section{{{sec}}} (appears {count}x)")
+            emit(f"  - \\section{{{sec}}} (appears {count}x)")
         issues += len(dup_sections)
 
     # 5. Duplicate labels
-    labels = extract_labels(all_tex)
+    labels = tex_items["label"]
     dup_labels = find_duplicates(labels)
     if dup_labels:
-        print(f"\n## DUPLICATE LABELS ({len(dup_labels)})")
+        emit(f"\n## DUPLICATE LABELS ({len(dup_labels)})")
         for label, count in sorted(dup_labels.items()):
-            print(f"  - \\label{{{label}}} (defined {count}x)")
+            emit(f"  - \\label{{{label}}} (defined {count}x)")
         issues += len(dup_labels)
 
     # 6. Undefined references
-    refs = extract_refs(all_tex)
+    refs = tex_items["ref"]
     label_set = set(labels)
     undefined_refs = [r for r in refs if r not in label_set]
     if undefined_refs:
-        print(f"\n## UNDEFINED REFERENCES ({len(set(undefined_refs))})")
+        emit(f"\n## UNDEFINED REFERENCES ({len(set(undefined_refs))})")
         for ref in sorted(set(undefined_refs)):
-            print(f"  - \\ref{{{ref}}}")
+            emit(f"  - \\ref{{{ref}}}")
         issues += len(set(undefined_refs))
 
     # 7. Figure file checks
     if args.check_figures:
         fig_dir = args.figures_dir or os.path.dirname(tex_files[0]) if tex_files else "."
-        fig_refs = extract_figure_refs(all_tex)
+        fig_refs = tex_items["figure"]
         for fig in fig_refs:
             fig_path = os.path.join(fig_dir, fig)
             if not os.path.exists(fig_path):
-                print(f"\n## MISSING FIGURE: {fig}")
-                print(f"  Not found at: {fig_path}")
+                emit(f"\n## MISSING FIGURE: {fig}")
+                emit(f"  Not found at: {fig_path}")
                 issues += 1
 
         # Duplicate figure references
         dup_figs = find_duplicates(fig_refs)
         if dup_figs:
-            print(f"\n## DUPLICATE FIGURES ({len(dup_figs)})")
+            emit(f"\n## DUPLICATE FIGURES ({len(dup_figs)})")
             for fig, count in sorted(dup_figs.items()):
-                print(f"  - {fig} (included {count}x)")
+                emit(f"  - {fig} (included {count}x)")
             issues += len(dup_figs)
 
     # Summary
-    print(f"\n## SUMMARY")
-    print(f"  Citations used: {len(cite_set)}")
-    print(f"  Bib entries: {len(bib_set)}")
-    print(f"  Labels defined: {len(set(labels))}")
-    print(f"  References used: {len(set(refs))}")
-    print(f"  Issues found: {issues}")
+    emit(f"\n## SUMMARY")
+    emit(f"  Citations used: {len(cite_set)}")
+    emit(f"  Bib entries: {len(bib_set)}")
+    emit(f"  Labels defined: {len(set(labels))}")
+    emit(f"  References used: {len(set(refs))}")
+    emit(f"  Issues found: {issues}")
 
     if issues == 0:
-        print("  All checks passed!")
+        emit("  All checks passed!")
 
     if args.fix and missing:
-        print(f"\n## AUTO-FIX: Generating placeholder entries for {len(missing)} missing keys")
+        emit(f"\n## AUTO-FIX: Generating placeholder entries for {len(missing)} missing keys")
         fix_entries = []
         for key in sorted(missing):
             entry = f"@misc{{{key},\n  title = {{{key.replace('_', ' ')}}},\n  note = {{TODO: Replace with actual reference}},\n  year = {{20XX}},\n}}"
             fix_entries.append(entry)
 
         fix_bib_path = args.bib.replace(".bib", "_fixed.bib")
-        with open(args.bib, encoding="utf-8", errors="replace") as f:
-            original_bib = f.read()
-        with open(fix_bib_path, "w", encoding="utf-8") as f:
-            f.write(original_bib)
-            f.write("\n\n% === Auto-generated placeholder entries ===\n")
+        with open(fix_bib_path, "wb") as f:
+            f.write(bib_bytes)
+            f.write(b"\n\n% === Auto-generated placeholder entries ===\n")
             for entry in fix_entries:
-                f.write("\n" + entry + "\n")
-        print(f"  Patched .bib written to: {fix_bib_path}")
-        print(f"  {len(fix_entries)} placeholder entries added (marked with TODO)")
+                f.write(("\n" + entry + "\n").encode("utf-8"))
+        emit(f"  Patched .bib written to: {fix_bib_path}")
+        emit(f"  {len(fix_entries)} placeholder entries added (marked with TODO)")
 
+    sys.stdout.write("\n".join(report) + "\n")
     sys.exit(1 if issues > 0 else 0)
 
 
@@ -16,14 +16,25 @@ Usage:
 """
 
 import argparse
+import bisect
 import csv
+import functools
 import json
 import sys
 
+try:
+    import orjson  # optional: faster JSON output
+except ImportError:
+    orjson = None
+
 P_VALUE_MIN = 1e-6
 DEFAULT_LEVELS = (0.05, 0.01, 0.001)
+STAR_SYMBOLS = ("***", "**", "*", "ns")
 
 
+# The per-value formatters are memoized since p-values in real results repeat
+# a lot (clipped minima, exact 0/1); typed=True keeps 2 and 2.0 apart.
+@functools.lru_cache(maxsize=1024, typed=True)
 def format_p_value(p: float, min_val: float = P_VALUE_MIN,
                    smaller_than: str = "<") -> str:
     """Format a p-value to a string with appropriate precision."""
@@ -36,6 +47,7 @@ def format_p_value(p: float, min_val: float = P_VALUE_MIN,
     return f"{smaller_than}{min_val}"
 
 
+@functools.lru_cache(maxsize=1024, typed=True)
 def format_p_value_latex(p: float, min_val: float = P_VALUE_MIN) -> str:
     """Format a p-value for LaTeX output."""
     if p >= min_val:
@@ -43,6 +55,7 @@ def format_p_value_latex(p: float, min_val: float = P_VALUE_MIN) -> str:
     return f"$<${min_val}"
 
 
+@functools.lru_cache(maxsize=1024, typed=True)
 def p_to_stars(p: float, levels: tuple = DEFAULT_LEVELS) -> str:
     """Convert p-value to significance stars.
 
@@ -57,6 +70,21 @@ def p_to_stars(p: float, levels: tuple = DEFAULT_LEVELS) -> str:
     return "ns"
 
 
+def p_values_to_stars(p_values: list[float],
+                      levels: tuple = DEFAULT_LEVELS) -> list[str]:
+    """Convert many p-values to significance stars at once.
+
+    Same result as p_to_stars per value (only levels[0..2] are used, in the
+    order given), but each value is placed with a single binary search.
+    """
+    thresholds = (levels[2], levels[1], levels[0])
+    if not thresholds[0] <= thresholds[1] <= thresholds[2]:
+        # bisect needs ascending thresholds; keep p_to_stars' cascade otherwise
+        return [p_to_stars(p, levels) for p in p_values]
+    bisect_right = bisect.bisect_right
+    return [STAR_SYMBOLS[bisect_right(thresholds, p)] for p in p_values]
+
+
 def stars_legend(levels: tuple = DEFAULT_LEVELS) -> str:
     """Generate a legend string for significance stars."""
     parts = [f"ns p >= {levels[0]}"]
@@ -79,6 +107,29 @@ def format_comparison(name1: str, name2: str, p: float,
         return f"{name1} vs {name2}: p={format_p_value(p)}"
 
 
+def write_results(results: list[dict], fmt: str, levels: tuple, out) -> None:
+    """Write formatted results to a text stream line by line."""
+    write = out.write
+    if fmt == "json":
+        if orjson is not None:
+            # Hand orjson's bytes to the underlying buffer, skipping a decode
+            out.flush()
+            out.buffer.write(orjson.dumps(results, option=orjson.OPT_INDENT_2) + b"\n")
+        else:
+            json.dump(results, out, indent=2)
+            write("\n")
+    elif fmt == "stars":
+        for r in results:
+            write(f"p={r['formatted']}  {r['stars']}\n")
+        write(f"\nLegend: {stars_legend(levels)}\n")
+    elif fmt == "latex":
+        for r in results:
+            write(f"{r['latex']}  {r['stars']}\n")
+    else:
+        for r in results:
+            write(f"p = {r['formatted']}\n")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Format p-values for academic papers")
     parser.add_argument("--values", help="Space-separated p-values")
@@ -118,35 +169,25 @@ def main():
         print("No valid p-values found.", file=sys.stderr)
         sys.exit(1)
 
+    # The text format shows no stars, so skip mapping (and validating) levels
+    stars = p_values_to_stars(p_values, levels) if args.format != "text" else None
     results = []
-    for p in p_values:
+    for i, p in enumerate(p_values):
         entry = {"p_value": p}
         entry["formatted"] = format_p_value(p)
-        entry["stars"] = p_to_stars(p, levels)
+        if stars is not None:
+            entry["stars"] = stars[i]
         entry["latex"] = format_p_value_latex(p)
         results.append(entry)
 
-    output_lines = []
-    if args.format == "json":
-        output_lines.append(json.dumps(results, indent=2))
-    elif args.format == "stars":
-        for r in results:
-            output_lines.append(f"p={r['formatted']}  {r['stars']}")
-        output_lines.append(f"\nLegend: {stars_legend(levels)}")
-    elif args.format == "latex":
-        for r in results:
-            output_lines.append(f"{r['latex']}  {r['stars']}")
-    else:
-        for r in results:
-            output_lines.append(f"p = {r['formatted']}")
-
-    text = "\n".join(output_lines) + "\n"
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    try:
+        write_results(results, args.format, levels, out)
+    finally:
+        if args.output:
+            out.close()
     if args.output:
-        with open(args.output, "w", encoding="utf-8") as f:
-            f.write(text)
         print(f"Written to {args.output}", file=sys.stderr)
-    else:
-        sys.stdout.write(text)
 
 
 if __name__ == "__main__":
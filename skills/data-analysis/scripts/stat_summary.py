@@ -4,7 +4,7 @@
 Takes experiment results in CSV/JSON, detects data types, recommends
 statistical tests, runs comparisons, and outputs formatted results.
 
-Requires: numpy, scipy
+Requires: numpy, scipy, pandas
 
 Usage:
     python stat_summary.py --input results.csv --compare method --metric accuracy --output summary.json
@@ -13,7 +13,6 @@ Usage:
 """
 
 import argparse
-import csv
 import json
 import math
 import os
@@ -21,105 +20,182 @@ import sys
 
 try:
     import numpy as np
+    import pandas as pd
     from scipy import stats
 except ImportError:
-    print("Error: numpy and scipy required. Install: pip install numpy scipy", file=sys.stderr)
+    print("Error: numpy, scipy and pandas required. Install: pip install numpy scipy pandas",
+          file=sys.stderr)
     sys.exit(1)
 
+try:
+    import orjson  # optional: faster JSON output
+except ImportError:
+    orjson = None
+
+
+def load_data(path: str, text_columns: tuple[str, ...] = ()) -> pd.DataFrame:
+    """Load data from CSV or JSON.
 
-def load_data(path: str) -> list[dict]:
-    """Load data from CSV or JSON."""
+    text_columns (e.g. the --compare column) keep each cell's raw text instead
+    of a dtype pandas infers, so group labels read "1" and "" rather than
+    "1.0" and "nan". In JSON input a record missing the key gets None.
+    """
     ext = os.path.splitext(path)[1].lower()
     if ext == ".csv":
-        with open(path, encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            return list(reader)
+        return pd.read_csv(path, engine="c", low_memory=False,
+                           converters={col: str for col in text_columns})
     elif ext == ".json":
         with open(path, encoding="utf-8") as f:
             data = json.load(f)
         if isinstance(data, list):
-            return data
+            frame = pd.DataFrame.from_records(data)
+            for col in text_columns:
+                if col in frame:
+                    frame[col] = pd.Series([str(row[col]) if col in row else None for row in data],
+                                           index=frame.index, dtype=object)
+            return frame
         raise ValueError("JSON must be a list of records")
     else:
         raise ValueError(f"Unsupported format: {ext}")
 
 
-def detect_numeric_columns(data: list[dict]) -> list[str]:
-    """Detect which columns contain numeric data."""
-    if not data:
+def detect_numeric_columns(data: pd.DataFrame) -> list[str]:
+    """Detect which columns contain numeric data.
+
+    A column counts as numeric when more than half of its rows hold a
+    number; text columns are coerced so stray text cells don't hide them.
+    """
+    if data.empty:
         return []
     numeric = []
-    for key in data[0].keys():
-        try:
-            vals = [float(row[key]) for row in data if row.get(key, "") != ""]
-            if len(vals) > len(data) * 0.5:
-                numeric.append(key)
-        except (ValueError, TypeError):
-            pass
+    for col in data.columns:
+        values = data[col]
+        if pd.api.types.is_bool_dtype(values):
+            continue
+        if not pd.api.types.is_numeric_dtype(values):
+            values = pd.to_numeric(values, errors="coerce")
+        if values.notna().sum() > len(data) * 0.5:
+            numeric.append(col)
     return numeric
 
 
-def get_column_values(data: list[dict], col: str) -> list[float]:
-    """Extract numeric values from a column."""
-    vals = []
-    for row in data:
-        try:
-            vals.append(float(row[col]))
-        except (ValueError, TypeError, KeyError):
-            pass
-    return vals
+def numeric_series(values: pd.Series) -> pd.Series:
+    """Return values as numbers, coercing text cells to NaN when needed."""
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        return values
+    return pd.to_numeric(values, errors="coerce")
+
+
+def get_column_values(data: pd.DataFrame, col: str) -> np.ndarray:
+    """Extract numeric values from a column as a float64 array."""
+    if col not in data:
+        return np.empty(0, dtype=np.float64)
+    values = numeric_series(data[col])
+    if not values.hasnans:
+        return values.to_numpy(dtype=np.float64, copy=False)
+    return values.dropna().to_numpy(dtype=np.float64, copy=False)
+
+
+def group_metric_values(data: pd.DataFrame, compare: str,
+                        metric: str) -> dict[str, np.ndarray]:
+    """Split the numeric values of a metric column by a grouping column.
+
+    Groups keep their order of first appearance and are labelled with the
+    group cell as text (see load_data's text_columns); rows without a numeric
+    metric are dropped and rows without a group cell fall under "unknown".
+    """
+    if metric not in data:
+        return {}
+    values = numeric_series(data[metric])
+    if compare in data:
+        keys = data[compare].astype(object).fillna("unknown").astype(str)
+    else:
+        keys = pd.Series("unknown", index=data.index)
+    mask = values.notna()
+    return {
+        str(name): group.to_numpy(dtype=np.float64, copy=False)
+        for name, group in values[mask].groupby(keys[mask], sort=False)
+    }
 
 
 def describe_column(values: list[float]) -> dict:
     """Compute descriptive statistics for a numeric column."""
-    arr = np.array(values)
+    arr = np.ascontiguousarray(values, dtype=np.float64)
+    q25, median, q75 = np.quantile(arr, (0.25, 0.5, 0.75))
     return {
         "count": len(arr),
-        "mean": float(np.mean(arr)),
-        "std": float(np.std(arr, ddof=1)) if len(arr) > 1 else 0.0,
-        "min": float(np.min(arr)),
-        "q25": float(np.percentile(arr, 25)),
-        "median": float(np.median(arr)),
-        "q75": float(np.percentile(arr, 75)),
-        "max": float(np.max(arr)),
+        "mean": float(arr.mean()),
+        "std": float(arr.std(ddof=1)) if len(arr) > 1 else 0.0,
+        "min": float(arr.min()),
+        "q25": float(q25),
+        "median": float(median),
+        "q75": float(q75),
+        "max": float(arr.max()),
     }
 
 
+# D'Agostino's K^2 needs at least 20 samples to be reliable; below that
+# Shapiro-Wilk is used, which is cheap at small n.
+NORMALTEST_MIN_N = 20
+NORMALITY_TEST = f"shapiro (n < {NORMALTEST_MIN_N}), dagostino (n >= {NORMALTEST_MIN_N})"
+
+
+def is_normal(values) -> bool:
+    """Check a group for normality (p >= 0.05).
+
+    Uses D'Agostino's K^2 test, which is linear-time and has no sample size
+    cap, and falls back to Shapiro-Wilk for small groups.
+    """
+    if len(values) < 3:
+        return False
+    if len(values) < NORMALTEST_MIN_N:
+        _, p = stats.shapiro(values)
+    else:
+        _, p = stats.normaltest(values)
+    return p >= 0.05
+
+
+def _recommend_from_flags(n_groups: int, all_normal: bool, paired: bool) -> str:
+    """Pick a test from the number of groups, normality and pairing."""
+    if n_groups < 2:
+        return "none"
+    if n_groups == 2:
+        if paired:
+            return "paired_ttest" if all_normal else "wilcoxon"
+        return "independent_ttest" if all_normal else "mann_whitney"
+    return "anova" if all_normal else "kruskal_wallis"
+
+
 def recommend_test(groups: list[list[float]]) -> str:
     """Recommend a statistical test based on the data."""
     n_groups = len(groups)
     if n_groups < 2:
         return "none"
+    all_normal = all(is_normal(g) for g in groups)
+    # Two groups of the same length are treated as paired
+    paired = n_groups == 2 and len(groups[0]) == len(groups[1])
+    return _recommend_from_flags(n_groups, all_normal, paired)
 
-    # Check normality (Shapiro-Wilk for each group)
-    all_normal = True
-    for g in groups:
-        if len(g) < 3:
-            all_normal = False
-            break
-        if len(g) <= 5000:
-            _, p = stats.shapiro(g)
-            if p < 0.05:
-                all_normal = False
-                break
 
-    if n_groups == 2:
-        # Check if paired (same length)
-        if len(groups[0]) == len(groups[1]):
-            return "paired_ttest" if all_normal else "wilcoxon"
-        return "independent_ttest" if all_normal else "mann_whitney"
-    else:
-        return "anova" if all_normal else "kruskal_wallis"
+def run_comparison(groups: dict[str, list[float]], test: str,
+                   desc_cache: dict[str, dict] | None = None) -> dict:
+    """Run a statistical comparison between groups.
 
-
-def run_comparison(groups: dict[str, list[float]], test: str) -> dict:
-    """Run a statistical comparison between groups."""
+    desc_cache optionally maps group names to precomputed describe_column()
+    results so they aren't recomputed for every comparison.
+    """
     group_names = list(groups.keys())
     group_values = list(groups.values())
+    if desc_cache is None:
+        desc_cache = {}
 
     result = {
         "test": test,
-        "groups": {name: describe_column(vals) for name, vals in groups.items()},
+        "normality_test": NORMALITY_TEST,
+        "groups": {
+            name: desc_cache[name] if name in desc_cache else describe_column(vals)
+            for name, vals in groups.items()
+        },
     }
 
     if test == "independent_ttest" and len(group_values) == 2:
@@ -152,14 +228,16 @@ def run_comparison(groups: dict[str, list[float]], test: str) -> dict:
         result["statistic"] = float(stat)
         result["p_value"] = float(p)
 
-    # Effect size (Cohen's d for two groups)
+    # Effect size (Cohen's d for two groups), from the cached group descriptors
     if len(group_values) == 2:
-        n1, n2 = len(group_values[0]), len(group_values[1])
-        m1, m2 = np.mean(group_values[0]), np.mean(group_values[1])
-        s1, s2 = np.std(group_values[0], ddof=1), np.std(group_values[1], ddof=1)
-        pooled_std = math.sqrt(((n1 - 1) * s1**2 + (n2 - 1) * s2**2) / (n1 + n2 - 2))
-        if pooled_std > 0:
-            result["cohens_d"] = float((m1 - m2) / pooled_std)
+        d1, d2 = result["groups"][group_names[0]], result["groups"][group_names[1]]
+        n1, n2 = d1["count"], d2["count"]
+        if n1 > 1 and n2 > 1:
+            m1, m2 = d1["mean"], d2["mean"]
+            s1, s2 = d1["std"], d2["std"]
+            pooled_std = math.sqrt(((n1 - 1) * s1 * s1 + (n2 - 1) * s2 * s2) / (n1 + n2 - 2))
+            if pooled_std > 0:
+                result["cohens_d"] = (m1 - m2) / pooled_std
 
     # Significance stars
     if "p_value" in result:
@@ -179,17 +257,29 @@ def run_comparison(groups: dict[str, list[float]], test: str) -> dict:
 def pairwise_comparisons(groups: dict[str, list[float]]) -> list[dict]:
     """Run pairwise comparisons between all groups."""
     names = list(groups.keys())
+    # Per-group statistics don't depend on the pairing; compute them once
+    desc = {name: describe_column(vals) for name, vals in groups.items()}
+    normal = {name: is_normal(vals) for name, vals in groups.items()}
     results = []
     for i in range(len(names)):
         for j in range(i + 1, len(names)):
-            pair = {names[i]: groups[names[i]], names[j]: groups[names[j]]}
-            test = recommend_test(list(pair.values()))
-            comp = run_comparison(pair, test)
+            a, b = names[i], names[j]
+            pair = {a: groups[a], b: groups[b]}
+            paired = len(groups[a]) == len(groups[b])
+            test = _recommend_from_flags(2, normal[a] and normal[b], paired)
+            comp = run_comparison(pair, test, desc_cache=desc)
             comp["pair"] = [names[i], names[j]]
             results.append(comp)
     return results
 
 
+def dump_json(obj) -> bytes:
+    """Serialize results as indented UTF-8 JSON (orjson when available)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+
 def main():
     parser = argparse.ArgumentParser(description="Statistical summary of experimental results")
     parser.add_argument("--input", required=True, help="Input file (.csv or .json)")
@@ -200,8 +290,8 @@ def main():
     parser.add_argument("--output", "-o", help="Output JSON file")
     args = parser.parse_args()
 
-    data = load_data(args.input)
-    if not data:
+    data = load_data(args.input, (args.compare,) if args.compare else ())
+    if data.empty:
         print("No data loaded.", file=sys.stderr)
         sys.exit(1)
 
@@ -214,16 +304,7 @@ def main():
             result["columns"][col] = describe_column(vals)
         print(f"Descriptive statistics for {len(numeric_cols)} numeric columns:", file=sys.stderr)
     elif args.compare and args.metric:
-        # Group by compare column
-        groups = {}
-        for row in data:
-            group = str(row.get(args.compare, "unknown"))
-            val = row.get(args.metric)
-            try:
-                val = float(val)
-            except (ValueError, TypeError):
-                continue
-            groups.setdefault(group, []).append(val)
+        groups = group_metric_values(data, args.compare, args.metric)
 
         if len(groups) < 2:
             print(f"Need at least 2 groups, found {len(groups)}", file=sys.stderr)
@@ -241,13 +322,13 @@ def main():
         print("Error: specify --describe or both --compare and --metric", file=sys.stderr)
         sys.exit(1)
 
-    output = json.dumps(result, indent=2, ensure_ascii=False)
+    output = dump_json(result)
     if args.output:
-        with open(args.output, "w", encoding="utf-8") as f:
+        with open(args.output, "wb") as f:
             f.write(output)
         print(f"Written to {args.output}", file=sys.stderr)
     else:
-        print(output)
+        sys.stdout.buffer.write(output + b"\n")
 
 
 if __name__ == "__main__":
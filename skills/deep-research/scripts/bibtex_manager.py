@@ -9,19 +9,39 @@ Usage:
 """
 
 import argparse
+import functools
 import json
 import re
 import sys
 import unicodedata
+from collections import Counter
+from typing import Callable, Iterable, Iterator, TextIO
 
+try:
+    import orjson  # optional: faster JSONL parsing
+except ImportError:
+    orjson = None
 
+TITLE_WORD_RE = re.compile(r"[a-z]+")
+TITLE_SKIP_WORDS = frozenset({"a", "an", "the", "on", "in", "of", "for", "to", "with", "and", "or"})
+# Deletes every ASCII character except a-z; last_name() only returns ASCII
+NON_LOWER_TABLE = str.maketrans("", "", "".join(
+    chr(c) for c in range(128) if not ord("a") <= c <= ord("z")
+))
+
+
+@functools.lru_cache(maxsize=16384)
 def normalize_name(name: str) -> str:
     """Normalize a name: strip accents, lowercase."""
+    if name.isascii():
+        # NFKD leaves ASCII untouched
+        return name.strip()
     nfkd = unicodedata.normalize("NFKD", name)
     ascii_name = nfkd.encode("ascii", "ignore").decode("ascii")
     return ascii_name.strip()
 
 
+@functools.lru_cache(maxsize=16384)
 def last_name(author: str) -> str:
     """Extract last name from an author string."""
     author = normalize_name(author)
@@ -36,7 +56,7 @@ def make_citation_key(paper: dict) -> str:
     authors = paper.get("authors", [])
     first_author = last_name(authors[0]) if authors else "unknown"
     # Remove non-alphanumeric from author
-    first_author = re.sub(r"[^a-z]", "", first_author)
+    first_author = first_author.translate(NON_LOWER_TABLE)
 
     year = paper.get("year", "")
     if not year:
@@ -47,24 +67,49 @@ def make_citation_key(paper: dict) -> str:
             year = "nd"
 
     title = paper.get("title", "")
-    skip_words = {"a", "an", "the", "on", "in", "of", "for", "to", "with", "and", "or"}
-    title_words = re.findall(r"[a-z]+", title.lower())
+    title_words = TITLE_WORD_RE.findall(title.lower())
     first_word = "paper"
     for w in title_words:
-        if w not in skip_words and len(w) > 2:
+        if w not in TITLE_SKIP_WORDS and len(w) > 2:
             first_word = w
             break
 
     return f"{first_author}{year}{first_word}"
 
 
+def key_suffix(n: int) -> str:
+    """Suffix for the n-th repeat of a key: 1 -> a, ..., 26 -> z, 27 -> aa."""
+    letters = ""
+    while n > 0:
+        n, rem = divmod(n - 1, 26)
+        letters = chr(97 + rem) + letters
+    return letters
+
+
+def unique_key(base: str, used: set[str], counts: Counter) -> str:
+    """Return base, or base with the next free suffix, and mark it used.
+
+    counts remembers how many suffixes each base key has handed out, so
+    repeated keys don't re-probe every earlier suffix.
+    """
+    n = counts[base]
+    key = base + key_suffix(n)
+    while key in used:
+        n += 1
+        key = base + key_suffix(n)
+    counts[base] = n + 1
+    used.add(key)
+    return key
+
+
+BIBTEX_ESCAPES = str.maketrans({"&": r"\&", "%": r"\%", "#": r"\#", "_": r"\_"})
+CONF_KEYWORDS = ("conference", "proceedings", "icml", "neurips", "iclr", "acl", "emnlp", "cvpr", "aaai")
+JOURNAL_KEYWORDS = ("journal", "transactions", "review")
+
+
 def escape_bibtex(text: str) -> str:
     """Escape special BibTeX characters."""
-    text = text.replace("&", r"\&")
-    text = text.replace("%", r"\%")
-    text = text.replace("#", r"\#")
-    text = text.replace("_", r"\_")
-    return text
+    return text.translate(BIBTEX_ESCAPES)
 
 
 def format_authors_bibtex(authors: list[str]) -> str:
@@ -74,8 +119,8 @@ def format_authors_bibtex(authors: list[str]) -> str:
     return " and ".join(authors)
 
 
-def paper_to_bibtex(paper: dict, key: str) -> str:
-    """Convert a paper record to a BibTeX entry."""
+def write_bibtex_entry(paper: dict, key: str, write: Callable[[str], object]) -> None:
+    """Emit a paper record as a BibTeX entry through write(), line by line."""
     arxiv_id = paper.get("arxiv_id", "")
     venue = paper.get("venue", "")
     year = paper.get("year", "")
@@ -83,73 +128,74 @@ def paper_to_bibtex(paper: dict, key: str) -> str:
         pub = paper.get("published", "") or paper.get("publicationDate", "") or ""
         year = pub[:4] if len(pub) >= 4 else ""
 
-    authors = format_authors_bibtex(paper.get("authors", []))
-    title = paper.get("title", "")
-    abstract_text = paper.get("abstract", "")
-
     # Determine entry type
-    conf_keywords = ["conference", "proceedings", "icml", "neurips", "iclr", "acl", "emnlp", "cvpr", "aaai"]
-    journal_keywords = ["journal", "transactions", "review"]
-
-    if venue and any(kw in venue.lower() for kw in conf_keywords):
+    venue_lower = venue.lower() if venue else ""
+    if venue and any(kw in venue_lower for kw in CONF_KEYWORDS):
         entry_type = "inproceedings"
-    elif venue and any(kw in venue.lower() for kw in journal_keywords):
+    elif venue and any(kw in venue_lower for kw in JOURNAL_KEYWORDS):
         entry_type = "article"
     elif arxiv_id:
         entry_type = "article"
     else:
         entry_type = "misc"
 
-    lines = [f"@{entry_type}{{{key},"]
-    lines.append(f"  title = {{{escape_bibtex(title)}}},")
-    lines.append(f"  author = {{{authors}}},")
+    write(f"@{entry_type}{{{key},\n")
+    write(f"  title = {{{escape_bibtex(paper.get('title', ''))}}},\n")
+    write(f"  author = {{{format_authors_bibtex(paper.get('authors', []))}}},\n")
     if year:
-        lines.append(f"  year = {{{year}}},")
+        write(f"  year = {{{year}}},\n")
     if venue:
         if entry_type == "inproceedings":
-            lines.append(f"  booktitle = {{{escape_bibtex(venue)}}},")
+            write(f"  booktitle = {{{escape_bibtex(venue)}}},\n")
         elif entry_type == "article" and not arxiv_id:
-            lines.append(f"  journal = {{{escape_bibtex(venue)}}},")
+            write(f"  journal = {{{escape_bibtex(venue)}}},\n")
     if arxiv_id:
-        lines.append(f"  eprint = {{{arxiv_id}}},")
-        lines.append(f"  archivePrefix = {{arXiv}},")
+        write(f"  eprint = {{{arxiv_id}}},\n")
+        write("  archivePrefix = {arXiv},\n")
         if not venue:
-            lines.append(f"  journal = {{arXiv preprint arXiv:{arxiv_id}}},")
+            write(f"  journal = {{arXiv preprint arXiv:{arxiv_id}}},\n")
     url = paper.get("url", "")
     if url:
-        lines.append(f"  url = {{{url}}},")
+        write(f"  url = {{{url}}},\n")
+    abstract_text = paper.get("abstract", "")
     if abstract_text:
-        short_abstract = abstract_text[:500]
-        lines.append(f"  abstract = {{{escape_bibtex(short_abstract)}}},")
-    lines.append("}")
+        write(f"  abstract = {{{escape_bibtex(abstract_text[:500])}}},\n")
+    write("}")
 
-    return "\n".join(lines)
+
+def paper_to_bibtex(paper: dict, key: str) -> str:
+    """Convert a paper record to a BibTeX entry."""
+    parts = []
+    write_bibtex_entry(paper, key, parts.append)
+    return "".join(parts)
 
 
-def load_jsonl(path: str) -> list[dict]:
-    """Load records from a JSONL file."""
-    records = []
-    with open(path, encoding="utf-8") as f:
+def load_jsonl(path: str) -> Iterator[dict]:
+    """Yield records from a JSONL file one at a time."""
+    loads = orjson.loads if orjson is not None else json.loads
+    with open(path, "rb") as f:
         for line in f:
             line = line.strip()
             if line:
-                records.append(json.loads(line))
-    return records
+                yield loads(line)
 
 
-def generate_bibtex(records: list[dict]) -> str:
-    """Generate BibTeX for all records, with deduplication by key."""
-    entries = {}
+def generate_bibtex(records: Iterable[dict], out: TextIO) -> int:
+    """Write BibTeX for all records to out, with deduplication by key.
+
+    Entries are written as they are generated, so records can be streamed
+    straight from load_jsonl(). Returns the number of entries written.
+    """
+    keys = set()
+    counts = Counter()
     for rec in records:
-        key = make_citation_key(rec)
-        original_key = key
-        suffix_idx = 0
-        while key in entries:
-            suffix_idx += 1
-            key = f"{original_key}{chr(96 + suffix_idx)}"  # a, b, c...
-        entries[key] = paper_to_bibtex(rec, key)
+        if keys:
+            out.write("\n\n")
+        key = unique_key(make_citation_key(rec), keys, counts)
+        write_bibtex_entry(rec, key, out.write)
 
-    return "\n\n".join(entries.values()) + "\n"
+    out.write("\n")
+    return len(keys)
 
 
 def main():
@@ -163,26 +209,20 @@ def main():
 
     if args.keys_only:
         seen = set()
+        counts = Counter()
         for rec in records:
-            key = make_citation_key(rec)
-            original_key = key
-            suffix_idx = 0
-            while key in seen:
-                suffix_idx += 1
-                key = f"{original_key}{chr(96 + suffix_idx)}"
-            seen.add(key)
+            key = unique_key(make_citation_key(rec), seen, counts)
             title = rec.get("title", "")[:60]
             print(f"{key}\t{title}")
         return
 
-    bibtex = generate_bibtex(records)
-
     if args.output:
         with open(args.output, "w", encoding="utf-8") as f:
-            f.write(bibtex)
-        print(f"Written {len(records)} entries to {args.output}", file=sys.stderr)
+            count = generate_bibtex(records, f)
+        print(f"Written {count} entries to {args.output}", file=sys.stderr)
     else:
-        print(bibtex)
+        generate_bibtex(records, sys.stdout)
+        sys.stdout.write("\n")
 
 
 if __name__ == "__main__":
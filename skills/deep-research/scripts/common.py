@@ -0,0 +1,111 @@
+"""Helpers shared by the deep-research scripts.
+
+Keep-alive HTTP with redirects and gzip, and JSONL record serialization.
+Imported as a sibling module (the scripts' directory is on sys.path when
+they are run directly). Self-contained: uses only stdlib; orjson is used
+if installed.
+"""
+
+import gzip
+import http.client
+import json
+import math
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+
+try:
+    import orjson  # optional: faster JSON serialization
+except ImportError:
+    orjson = None
+
+MAX_REDIRECTS = 5
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+# http.client ignores proxy settings, so fall back to urllib when one is set
+USE_KEEPALIVE = not urllib.request.getproxies()
+
+_local = threading.local()  # per-thread (scheme, netloc) -> keep-alive connection
+
+
+def _has_nonfinite(value) -> bool:
+    """True if value holds a NaN or infinite float anywhere."""
+    if isinstance(value, float):
+        return not math.isfinite(value)
+    if isinstance(value, dict):
+        return any(_has_nonfinite(v) for v in value.values())
+    if isinstance(value, list):
+        return any(_has_nonfinite(v) for v in value)
+    return False
+
+
+def dump_record(rec: dict) -> bytes:
+    """Serialize one record as a UTF-8 JSONL line (orjson when available)."""
+    if orjson is not None:
+        line = orjson.dumps(rec)
+        # orjson writes NaN/Infinity as null; json keeps the tokens it reads back
+        if b"null" not in line or not _has_nonfinite(rec):
+            return line + b"\n"
+    return (json.dumps(rec, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def get_connection(scheme: str, netloc: str, timeout: int) -> http.client.HTTPConnection:
+    """Return this thread's open connection to a host, creating it if needed."""
+    conns = _local.__dict__.setdefault("conns", {})
+    conn = conns.get((scheme, netloc))
+    if conn is None:
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        conn = conns[(scheme, netloc)] = cls(netloc, timeout=timeout)
+    return conn
+
+
+def open_url(url: str, headers: dict, data: bytes | None = None, timeout: int = 30):
+    """GET (or POST data to) a URL over a reused keep-alive connection.
+
+    Follows redirects and returns the response unread; it must be read to
+    the end (or its .connection closed) before the next request to the same
+    host. Raises urllib.error.HTTPError for 4xx/5xx like urlopen().
+    """
+    if not USE_KEEPALIVE:
+        req = urllib.request.Request(url, data=data, headers=headers)
+        return urllib.request.urlopen(req, timeout=timeout)
+
+    method = "GET" if data is None else "POST"
+    for _ in range(MAX_REDIRECTS + 1):
+        parts = urllib.parse.urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        conn = get_connection(parts.scheme, parts.netloc, timeout)
+        try:
+            conn.request(method, path, body=data, headers=headers)
+            resp = conn.getresponse()
+        except (http.client.HTTPException, OSError):
+            # Server dropped the idle connection (or a previous response
+            # was abandoned mid-body): reconnect once.
+            conn.close()
+            conn.request(method, path, body=data, headers=headers)
+            resp = conn.getresponse()
+
+        if resp.status in REDIRECT_CODES and resp.getheader("Location"):
+            resp.read()
+            url = urllib.parse.urljoin(url, resp.getheader("Location"))
+            if resp.status == 303:
+                method, data = "GET", None
+            continue
+        if resp.status >= 400:
+            resp.read()
+            conn.close()  # don't reuse a connection the server may be shedding
+            raise urllib.error.HTTPError(url, resp.status, resp.reason, resp.headers, None)
+        resp.connection = conn  # lets callers drop a connection they stop reading
+        return resp
+
+    raise urllib.error.URLError(f"too many redirects for {url}")
+
+
+def http_fetch(url: str, headers: dict, data: bytes | None = None, timeout: int = 30) -> bytes:
+    """Fetch a URL with open_url, asking for gzip, and return the decoded body."""
+    with open_url(url, {**headers, "Accept-Encoding": "gzip"}, data, timeout) as resp:
+        body = resp.read()
+        encoding = resp.getheader("Content-Encoding")
+    return gzip.decompress(body) if encoding == "gzip" else body
@@ -11,32 +11,49 @@ Usage:
 """
 
 import argparse
+import heapq
 import json
 import os
 import re
 import sys
 from collections import Counter
 
+try:
+    import orjson  # optional: faster JSONL parsing
+except ImportError:
+    orjson = None
 
-def load_papers(jsonl_path: str) -> list[dict]:
-    """Load paper records from JSONL."""
-    papers = []
-    if not os.path.exists(jsonl_path):
-        return papers
-    with open(jsonl_path) as f:
+CITATION_RE = re.compile(r"\[@([^\]]+)\]")
+
+
+def iter_papers(jsonl_path: str):
+    """Yield paper records from a JSONL file one at a time."""
+    loads = orjson.loads if orjson is not None else json.loads
+    with open(jsonl_path, "rb") as f:
         for line in f:
             line = line.strip()
             if line:
-                papers.append(json.loads(line))
-    return papers
+                yield loads(line)
+
+
+def load_papers(jsonl_path: str) -> list[dict]:
+    """Load paper records from JSONL."""
+    if not os.path.exists(jsonl_path):
+        return []
+    return list(iter_papers(jsonl_path))
 
 
 def load_text(path: str) -> str:
     """Load a text file, return empty string if missing."""
-    if not os.path.exists(path):
+    try:
+        with open(path, "rb") as f:
+            text = f.read().decode("utf-8", "replace")
+    except FileNotFoundError:
         return ""
-    with open(path) as f:
-        return f.read()
+    if "\r" in text:
+        # Same newline handling as text mode
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
 
 
 def make_cite_key(paper: dict) -> str:
@@ -46,14 +63,15 @@ def make_cite_key(paper: dict) -> str:
         return arxiv_id.replace("/", "_").replace(".", "_")
     # Fallback: first author last name + year
     authors = paper.get("authors", [])
-    first = authors[0].split()[-1].lower() if authors else "unknown"
+    first = authors[0].rsplit(None, 1)[-1].lower() if authors else "unknown"
     year = paper.get("year") or paper.get("published", "")[:4] or "0000"
-    title_word = paper.get("title", "").split()[0].lower() if paper.get("title") else "paper"
+    title = paper.get("title")
+    title_word = title.split(None, 1)[0].lower() if title else "paper"
     return f"{first}{year}_{title_word}"
 
 
-def paper_to_bibtex(paper: dict, cite_key: str) -> str:
-    """Convert a paper record to BibTeX entry."""
+def write_bibtex_entry(paper: dict, cite_key: str, write) -> None:
+    """Emit a paper record as a BibTeX entry through write() (no trailing newline)."""
     authors = " and ".join(paper.get("authors", ["Unknown"]))
     title = paper.get("title", "Unknown")
     year = paper.get("year") or paper.get("published", "")[:4] or ""
@@ -63,26 +81,47 @@ def paper_to_bibtex(paper: dict, cite_key: str) -> str:
 
     if venue:
         entry_type = "inproceedings"
-        venue_field = f"  booktitle = {{{venue}}},"
+        venue_field = f"  booktitle = {{{venue}}},\n"
     elif arxiv_id:
         entry_type = "article"
-        venue_field = f"  journal = {{arXiv preprint arXiv:{arxiv_id}}},"
+        venue_field = f"  journal = {{arXiv preprint arXiv:{arxiv_id}}},\n"
     else:
         entry_type = "article"
         venue_field = ""
 
-    lines = [
-        f"@{entry_type}{{{cite_key},",
-        f"  title = {{{title}}},",
-        f"  author = {{{authors}}},",
-        f"  year = {{{year}}},",
-    ]
+    write(f"@{entry_type}{{{cite_key},\n")
+    write(f"  title = {{{title}}},\n")
+    write(f"  author = {{{authors}}},\n")
+    write(f"  year = {{{year}}},\n")
     if venue_field:
-        lines.append(venue_field)
+        write(venue_field)
     if url:
-        lines.append(f"  url = {{{url}}},")
-    lines.append("}")
-    return "\n".join(lines)
+        write(f"  url = {{{url}}},\n")
+    write("}")
+
+
+def paper_to_bibtex(paper: dict, cite_key: str) -> str:
+    """Convert a paper record to BibTeX entry."""
+    parts = []
+    write_bibtex_entry(paper, cite_key, parts.append)
+    return "".join(parts)
+
+
+def add_citation(cite_map: dict, num: int, paper: dict) -> str:
+    """Number a paper and register its identifiers in cite_map. Returns its cite key."""
+    cite_key = make_cite_key(paper)
+    paper["_cite_key"] = cite_key
+    paper["_cite_num"] = num
+
+    entry = (num, paper)
+    arxiv_id = paper.get("arxiv_id")
+    if arxiv_id:
+        cite_map[arxiv_id] = entry
+    paper_id = paper.get("paperId")
+    if paper_id:
+        cite_map[paper_id] = entry
+    cite_map[cite_key] = entry
+    return cite_key
 
 
 def build_citation_map(papers: list[dict]) -> dict[str, tuple[int, dict]]:
@@ -92,62 +131,65 @@ def build_citation_map(papers: list[dict]) -> dict[str, tuple[int, dict]]:
     """
     cite_map = {}
     for i, paper in enumerate(papers, 1):
-        cite_key = make_cite_key(paper)
-        paper["_cite_key"] = cite_key
-        paper["_cite_num"] = i
-
-        if paper.get("arxiv_id"):
-            cite_map[paper["arxiv_id"]] = (i, paper)
-        if paper.get("paperId"):
-            cite_map[paper["paperId"]] = (i, paper)
-        cite_map[cite_key] = (i, paper)
-
+        add_citation(cite_map, i, paper)
     return cite_map
 
 
 def replace_citations(text: str, cite_map: dict[str, tuple[int, dict]]) -> str:
     """Replace [@key] citations in text with numbered [N] references."""
+    if "[@" not in text:
+        return text
+    get = cite_map.get
+
     def replacer(match):
-        key = match.group(1)
-        if key in cite_map:
-            num, _ = cite_map[key]
-            return f"[{num}]"
-        return match.group(0)  # leave unchanged if not found
+        hit = get(match.group(1))
+        return f"[{hit[0]}]" if hit else match.group(0)  # unknown keys unchanged
+
+    return CITATION_RE.sub(replacer, text)
 
-    return re.sub(r"\[@([^\]]+)\]", replacer, text)
+
+def normalize_year(y):
+    """Normalize a year field to int for consistent grouping ("Unknown" if unusable)."""
+    if y is None:
+        return "Unknown"
+    try:
+        return int(y)
+    except (ValueError, TypeError):
+        return "Unknown"
 
 
 def compute_stats(papers: list[dict]) -> str:
     """Generate summary statistics section."""
+    years = Counter([normalize_year(p.get("year")) for p in papers])
+    venues = Counter([p.get("venue", "") or "Preprint" for p in papers])
+    return format_stats(papers, years, venues)
+
+
+def format_stats(papers: list[dict], years: Counter, venues: Counter) -> str:
+    """Render the statistics section from precomputed year and venue counts."""
     if not papers:
         return "No papers in database."
 
     lines = []
     lines.append(f"**Total papers**: {len(papers)}")
 
-    # By year (normalize to int for consistent grouping)
-    def normalize_year(y):
-        if y is None:
-            return "Unknown"
-        try:
-            return int(y)
-        except (ValueError, TypeError):
-            return "Unknown"
-
-    years = Counter(normalize_year(p.get("year")) for p in papers)
+    # By year
     lines.append("\n**Papers by year**:")
-    for year in sorted(years.keys(), key=lambda x: (0, 0) if x == "Unknown" else (1, x), reverse=True):
+    # Newest first, "Unknown" last
+    order = sorted((y for y in years if y != "Unknown"), reverse=True)
+    if "Unknown" in years:
+        order.append("Unknown")
+    for year in order:
         lines.append(f"- {year}: {years[year]}")
 
     # By venue (top 10)
-    venues = Counter(p.get("venue", "") or "Preprint" for p in papers)
     top_venues = venues.most_common(10)
     lines.append("\n**Top venues**:")
     for venue, count in top_venues:
         lines.append(f"- {venue}: {count}")
 
     # Top cited
-    cited = sorted(papers, key=lambda p: p.get("citationCount", 0) or 0, reverse=True)[:10]
+    cited = heapq.nlargest(10, papers, key=lambda p: p.get("citationCount", 0) or 0)
     if any(p.get("citationCount", 0) for p in cited):
         lines.append("\n**Most cited papers**:")
         for p in cited:
@@ -158,6 +200,15 @@ def compute_stats(papers: list[dict]) -> str:
     return "\n".join(lines)
 
 
+def scan_files(directory: str) -> dict[str, str]:
+    """Map file names to paths for the regular files in a directory."""
+    try:
+        with os.scandir(directory) as it:
+            return {entry.name: entry.path for entry in it if entry.is_file()}
+    except (FileNotFoundError, NotADirectoryError):
+        return {}
+
+
 def load_notes(topic_dir: str) -> str:
     """Load note files from phase-based directory structure.
 
@@ -174,36 +225,102 @@ def load_notes(topic_dir: str) -> str:
         ("phase5_synthesis", "synthesis.md"),
         ("phase5_synthesis", "gaps.md"),
     ]
+    listings = {}
+
+    def read_note(subdir: str, filename: str) -> str:
+        # One scandir per directory instead of a stat per candidate file
+        if subdir not in listings:
+            listings[subdir] = scan_files(os.path.join(topic_dir, subdir))
+        path = listings[subdir].get(filename)
+        return load_text(path) if path else ""
+
     parts = []
     for subdir, filename in phase_notes:
-        path = os.path.join(topic_dir, subdir, filename)
-        if os.path.exists(path):
-            content = load_text(path)
-            if content.strip():
-                parts.append(content)
+        content = read_note(subdir, filename)
+        if content.strip():
+            parts.append(content)
 
     if parts:
         return "\n\n---\n\n".join(parts)
 
     # Fallback: legacy notes/ directory
-    notes_dir = os.path.join(topic_dir, "notes")
     legacy_files = ["frontier.md", "survey.md", "deep_dive.md", "synthesis.md", "gaps.md"]
-    if os.path.isdir(notes_dir):
-        for name in legacy_files:
-            path = os.path.join(notes_dir, name)
-            if os.path.exists(path):
-                content = load_text(path)
-                if content.strip():
-                    parts.append(content)
+    for name in legacy_files:
+        content = read_note("notes", name)
+        if content.strip():
+            parts.append(content)
 
     if not parts:
-        fallback = load_text(os.path.join(topic_dir, "notes.md"))
+        fallback = read_note("", "notes.md")
         if fallback.strip():
             parts.append(fallback)
 
     return "\n\n---\n\n".join(parts)
 
 
+def format_reference(paper: dict) -> str:
+    """Render one numbered entry of the References section."""
+    num = paper.get("_cite_num", "?")
+    title = paper.get("title", "Unknown")
+    authors = paper.get("authors", [])
+    year = paper.get("year") or paper.get("published", "")[:4] or ""
+    author_str = ", ".join(authors[:3])
+    if len(authors) > 3:
+        author_str += " et al."
+    venue = paper.get("venue", "")
+    venue_str = f" {venue}." if venue else ""
+    url = paper.get("url", "")
+    url_str = f" {url}" if url else ""
+    return f"[{num}] {author_str}. \"{title}\". {year}.{venue_str}{url_str}\n"
+
+
+def iter_report_parts(topic_name: str, n_papers: int, stats: str, processed_notes: str,
+                      code_resources: str, references: list[str]):
+    """Yield the report's parts in order (joined by newlines when written)."""
+    # Title
+    yield f"# Research Report: {topic_name}\n"
+    yield f"*Generated from {n_papers} papers*\n"
+
+    # Statistics
+    yield "## Paper Statistics\n"
+    yield stats
+
+    # Notes (the main content)
+    if processed_notes:
+        yield "\n---\n"
+        yield processed_notes
+
+    # Code resources
+    if code_resources:
+        yield "\n---\n"
+        yield "## Code & Tools\n"
+        yield code_resources
+
+    # References
+    yield "\n---\n"
+    yield "## References\n"
+    yield from references
+
+
+def write_parts(path: str, parts, sep: str) -> int:
+    """Stream text parts to a UTF-8 file, separated by `sep`.
+
+    Same bytes as writing sep.join(parts), without building the joined
+    string. Returns the number of characters written.
+    """
+    sep_bytes = sep.encode("utf-8")
+    n_chars = 0
+    with open(path, "wb", buffering=1 << 20) as f:
+        write = f.write
+        for i, part in enumerate(parts):
+            if i:
+                write(sep_bytes)
+                n_chars += len(sep)
+            write(part.encode("utf-8"))
+            n_chars += len(part)
+    return n_chars
+
+
 def compile_report(topic_dir: str):
     """Compile all materials into a final report."""
     paper_db_path = os.path.join(topic_dir, "paper_db.jsonl")
@@ -228,67 +345,33 @@ def compile_report(topic_dir: str):
     if not papers and not notes:
         print("Warning: no papers or notes found", file=sys.stderr)
 
-    cite_map = build_citation_map(papers)
+    # One pass over the papers: number them, build the citation map, count
+    # stats, render references and write the BibTeX entries.
+    cite_map = {}
+    years = Counter()
+    venues = Counter()
+    references = []
+    with open(bib_path, "w", encoding="utf-8", buffering=1 << 20) as bib:
+        write_bib = bib.write
+        for i, paper in enumerate(papers, 1):
+            cite_key = add_citation(cite_map, i, paper)
+            years[normalize_year(paper.get("year"))] += 1
+            venues[paper.get("venue", "") or "Preprint"] += 1
+            references.append(format_reference(paper))
+            if i > 1:
+                write_bib("\n\n")
+            write_bibtex_entry(paper, cite_key, write_bib)
+        write_bib("\n")
 
     # Process notes: replace [@key] with [N]
     processed_notes = replace_citations(notes, cite_map)
 
-    # Build report
-    report_parts = []
-
-    # Title
     topic_name = os.path.basename(topic_dir.rstrip("/")).replace("-", " ").title()
-    report_parts.append(f"# Research Report: {topic_name}\n")
-    report_parts.append(f"*Generated from {len(papers)} papers*\n")
-
-    # Statistics
-    report_parts.append("## Paper Statistics\n")
-    report_parts.append(compute_stats(papers))
-
-    # Notes (the main content)
-    if processed_notes:
-        report_parts.append("\n---\n")
-        report_parts.append(processed_notes)
-
-    # Code resources
-    if code_resources:
-        report_parts.append("\n---\n")
-        report_parts.append("## Code & Tools\n")
-        report_parts.append(code_resources)
-
-    # References
-    report_parts.append("\n---\n")
-    report_parts.append("## References\n")
-    for paper in papers:
-        num = paper.get("_cite_num", "?")
-        title = paper.get("title", "Unknown")
-        authors = paper.get("authors", [])
-        year = paper.get("year") or paper.get("published", "")[:4] or ""
-        author_str = ", ".join(authors[:3])
-        if len(authors) > 3:
-            author_str += " et al."
-        venue = paper.get("venue", "")
-        venue_str = f" {venue}." if venue else ""
-        url = paper.get("url", "")
-        url_str = f" {url}" if url else ""
-        report_parts.append(f"[{num}] {author_str}. \"{title}\". {year}.{venue_str}{url_str}\n")
-
-    report_text = "\n".join(report_parts)
-
-    # Write report
-    with open(report_path, "w") as f:
-        f.write(report_text)
-    print(f"Report written to {report_path} ({len(report_text)} chars)", file=sys.stderr)
-
-    # Write BibTeX
-    bib_entries = []
-    for paper in papers:
-        cite_key = paper.get("_cite_key", make_cite_key(paper))
-        bib_entries.append(paper_to_bibtex(paper, cite_key))
-
-    with open(bib_path, "w") as f:
-        f.write("\n\n".join(bib_entries) + "\n")
-    print(f"BibTeX written to {bib_path} ({len(bib_entries)} entries)", file=sys.stderr)
+    report_parts = iter_report_parts(topic_name, len(papers), format_stats(papers, years, venues),
+                                     processed_notes, code_resources, references)
+    n_chars = write_parts(report_path, report_parts, "\n")
+    print(f"Report written to {report_path} ({n_chars} chars)", file=sys.stderr)
+    print(f"BibTeX written to {bib_path} ({len(papers)} entries)", file=sys.stderr)
 
 
 def main():
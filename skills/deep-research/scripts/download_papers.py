@@ -1,13 +1,15 @@
 #!/usr/bin/env python3
 """Download PDFs from a JSONL paper database.
 
-Self-contained: uses only stdlib (urllib).
+Self-contained: uses only stdlib (HTTP via the sibling common.py).
 
 Features:
 - Atomic downloads (.part file -> rename on success)
 - PDF validation (checks %PDF header + %%EOF trailer)
-- Respects rate limits (configurable delay)
-- Skips already-downloaded papers
+- Respects per-host rate limits (configurable delay)
+- Downloads from different hosts in parallel (--workers, --per-host)
+- Skips already-downloaded papers (validated once, then tracked in a manifest)
+- Reuses keep-alive connections per host
 
 Usage:
     python download_papers.py --jsonl paper_db.jsonl --output-dir papers/
@@ -18,8 +20,25 @@ import argparse
 import json
 import os
 import sys
+import threading
 import time
-import urllib.request
+import urllib.parse
+from collections import defaultdict
+from contextlib import contextmanager
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+try:
+    import orjson  # optional: faster JSONL parsing
+except ImportError:
+    orjson = None
+
+from common import open_url
+
+HEADERS = {
+    "User-Agent": "deep-research/1.0 (academic research tool)",
+}
+CHUNK_SIZE = 1 << 16
+MANIFEST_NAME = ".manifest.json"
 
 
 def sanitize_filename(arxiv_id: str, paper_id: str) -> str:
@@ -49,36 +68,110 @@ def validate_pdf(path: str) -> bool:
         return False
 
 
-def download_pdf(url: str, dest: str, timeout: int = 60) -> bool:
+class HostRateLimiter:
+    """Per-host politeness: at most `max_per_host` downloads at a time, and
+    requests to the same host at least `delay` seconds apart.
+
+    Each host has its own lock and slots, so threads fetching from
+    different hosts never wait on each other.
+    """
+
+    def __init__(self, delay: float, max_per_host: int = 2):
+        self.delay = delay
+        self.max_per_host = max_per_host
+        self.locks = defaultdict(threading.Lock)
+        self.last_hit = {}
+        self.slots = {}
+        self.slots_lock = threading.Lock()
+
+    @contextmanager
+    def slot(self, url: str):
+        """Hold one of the host's download slots (after the delay) while in use."""
+        host = urllib.parse.urlparse(url).netloc
+        with self.slots_lock:
+            semaphore = self.slots.get(host)
+            if semaphore is None:
+                semaphore = self.slots[host] = threading.BoundedSemaphore(self.max_per_host)
+        with semaphore:
+            self.wait(url)
+            yield
+
+    def wait(self, url: str):
+        host = urllib.parse.urlparse(url).netloc
+        with self.locks[host]:
+            last = self.last_hit.get(host)
+            if last is not None:
+                remaining = last + self.delay - time.monotonic()
+                if remaining > 0:
+                    time.sleep(remaining)
+            self.last_hit[host] = time.monotonic()
+
+
+def abort_response(resp):
+    """Close a response that was not read to the end, and its connection."""
+    resp.close()
+    conn = getattr(resp, "connection", None)
+    if conn is not None:
+        conn.close()  # reopened on the next request to this host
+
+
+def write_pdf_body(resp, f, first: bytes) -> bool:
+    """Stream a response body to f, starting with the already-read first chunk.
+
+    Returns whether the body ends like a PDF (%%EOF in the last 1KB), so
+    the file needn't be reread to validate it.
+    """
+    length = resp.headers.get("Content-Length", "")
+    if length.isdigit() and hasattr(os, "posix_fallocate"):
+        try:
+            os.posix_fallocate(f.fileno(), 0, int(length))
+        except OSError:
+            pass
+
+    chunk = first
+    tail = b""
+    while chunk:
+        f.write(chunk)
+        tail = chunk[-1024:] if len(chunk) >= 1024 else (tail + chunk)[-1024:]
+        chunk = resp.read(CHUNK_SIZE)
+    f.truncate()  # in case fewer bytes arrived than were preallocated
+    return b"%%EOF" in tail
+
+
+def download_pdf(url: str, dest: str, timeout: int = 60,
+                 limiter: HostRateLimiter | None = None) -> bool:
     """Download a PDF with atomic write. Returns True on success."""
-    part_path = dest + ".part"
+    if limiter is not None:
+        with limiter.slot(url):
+            return download_pdf(url, dest, timeout)
 
-    headers = {
-        "User-Agent": "deep-research/1.0 (academic research tool)",
-    }
-    req = urllib.request.Request(url, headers=headers)
+    part_path = dest + ".part"
 
     try:
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
+        with open_url(url, HEADERS, timeout=timeout) as resp:
             content_type = resp.headers.get("Content-Type", "")
             # Some servers redirect to HTML (captcha, etc.)
             if "text/html" in content_type and "pdf" not in content_type:
                 print(f"  Warning: got HTML instead of PDF from {url}", file=sys.stderr)
+                abort_response(resp)
+                return False
+
+            # Peek at the body before touching the disk
+            first = resp.read(CHUNK_SIZE)
+            if not first.startswith(b"%PDF-"):
+                print(f"  Warning: invalid PDF from {url}", file=sys.stderr)
+                abort_response(resp)
                 return False
 
             with open(part_path, "wb") as f:
-                while True:
-                    chunk = resp.read(8192)
-                    if not chunk:
-                        break
-                    f.write(chunk)
+                valid = write_pdf_body(resp, f, first)
 
-        if not validate_pdf(part_path):
+        if not valid:
             print(f"  Warning: invalid PDF from {url}", file=sys.stderr)
             os.remove(part_path)
             return False
 
-        os.rename(part_path, dest)
+        os.replace(part_path, dest)
         return True
 
     except Exception as e:
@@ -88,15 +181,45 @@ def download_pdf(url: str, dest: str, timeout: int = 60) -> bool:
         return False
 
 
-def load_papers(jsonl_path: str) -> list[dict]:
-    """Load papers from a JSONL file."""
-    papers = []
-    with open(jsonl_path) as f:
+def file_state(path: str) -> dict | None:
+    """Size and mtime of a file, as recorded in the manifest (None if missing)."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def load_manifest(path: str) -> dict:
+    """Load the filename -> file state manifest of validated downloads."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_manifest(path: str, manifest: dict):
+    """Write the manifest atomically (temp file + rename)."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, path)
+
+
+def iter_papers(jsonl_path: str):
+    """Yield paper records from a JSONL file one at a time."""
+    loads = orjson.loads if orjson is not None else json.loads
+    with open(jsonl_path, "rb") as f:
         for line in f:
             line = line.strip()
             if line:
-                papers.append(json.loads(line))
-    return papers
+                yield loads(line)
+
+
+def load_papers(jsonl_path: str) -> list[dict]:
+    """Load papers from a JSONL file."""
+    return list(iter_papers(jsonl_path))
 
 
 def main():
@@ -104,51 +227,99 @@ def main():
     parser.add_argument("--jsonl", required=True, help="JSONL file with paper records")
     parser.add_argument("--output-dir", required=True, help="Directory to save PDFs")
     parser.add_argument("--max-downloads", type=int, default=50, help="Max PDFs to download")
-    parser.add_argument("--delay", type=float, default=1.0, help="Seconds between downloads")
+    parser.add_argument("--delay", type=float, default=1.0,
+                        help="Seconds between downloads from the same host")
+    parser.add_argument("--workers", type=int, default=8,
+                        help="Parallel downloads (default: 8)")
+    parser.add_argument("--per-host", type=int, default=2,
+                        help="Max concurrent downloads from one host (default: 2)")
     parser.add_argument("--timeout", type=int, default=60, help="Download timeout in seconds")
     parser.add_argument("--sort-by-citations", action="store_true", help="Download most-cited first")
     args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.per_host < 1:
+        parser.error("--per-host must be at least 1")
 
     os.makedirs(args.output_dir, exist_ok=True)
 
-    papers = load_papers(args.jsonl)
-
+    # Only sorting needs the whole database in memory; otherwise stream it
     if args.sort_by_citations:
+        papers = load_papers(args.jsonl)
         papers.sort(key=lambda p: p.get("citationCount", 0) or 0, reverse=True)
+    else:
+        papers = iter_papers(args.jsonl)
 
+    manifest_path = os.path.join(args.output_dir, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+    manifest_changed = False
+    limiter = HostRateLimiter(args.delay, args.per_host)
     downloaded = 0
     skipped = 0
     failed = 0
-
-    for paper in papers:
-        if downloaded >= args.max_downloads:
-            break
-
-        pdf_url = paper.get("pdf_url", "")
-        if not pdf_url:
-            continue
-
-        arxiv_id = paper.get("arxiv_id", "")
-        paper_id = paper.get("paperId", "")
-        filename = sanitize_filename(arxiv_id, paper_id)
-        dest = os.path.join(args.output_dir, filename)
-
-        if os.path.exists(dest):
-            skipped += 1
-            continue
-
-        title = paper.get("title", "unknown")[:60]
-        print(f"[{downloaded + 1}/{args.max_downloads}] {title}...", file=sys.stderr)
-
-        if download_pdf(pdf_url, dest, timeout=args.timeout):
-            size_mb = os.path.getsize(dest) / (1024 * 1024)
-            print(f"  OK ({size_mb:.1f} MB)", file=sys.stderr)
-            downloaded += 1
-        else:
-            failed += 1
-
-        if downloaded < args.max_downloads:
-            time.sleep(args.delay)
+    pending = {}  # future -> (title, dest)
+    remaining = iter(papers)
+
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        while True:
+            # Keep the pool busy, but never have more downloads in flight
+            # than could still count towards --max-downloads.
+            while len(pending) < args.workers and downloaded + len(pending) < args.max_downloads:
+                paper = next(remaining, None)
+                if paper is None:
+                    break
+
+                pdf_url = paper.get("pdf_url", "")
+                if not pdf_url:
+                    continue
+
+                arxiv_id = paper.get("arxiv_id", "")
+                paper_id = paper.get("paperId", "")
+                filename = sanitize_filename(arxiv_id, paper_id)
+                dest = os.path.join(args.output_dir, filename)
+
+                if any(dest == d for _, d in pending.values()):
+                    skipped += 1
+                    continue
+                state = file_state(dest)
+                if state is not None:
+                    # Files unchanged since they were validated are skipped
+                    # without being opened; others are validated once.
+                    if manifest.get(filename) == state:
+                        skipped += 1
+                        continue
+                    if validate_pdf(dest):
+                        manifest[filename] = state
+                        manifest_changed = True
+                        skipped += 1
+                        continue
+                    print(f"  Existing {filename} is not a valid PDF, downloading again",
+                          file=sys.stderr)
+
+                title = paper.get("title", "unknown")[:60]
+                print(f"[{downloaded + len(pending) + 1}/{args.max_downloads}] {title}...",
+                      file=sys.stderr)
+                future = executor.submit(download_pdf, pdf_url, dest, args.timeout, limiter)
+                pending[future] = (title, dest)
+
+            if not pending:
+                break
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                title, dest = pending.pop(future)
+                if future.result():
+                    state = file_state(dest)
+                    size_mb = state["size"] / (1024 * 1024)
+                    print(f"  OK {title} ({size_mb:.1f} MB)", file=sys.stderr)
+                    downloaded += 1
+                    manifest[os.path.basename(dest)] = state
+                    save_manifest(manifest_path, manifest)
+                else:
+                    failed += 1
+
+    if manifest_changed:
+        save_manifest(manifest_path, manifest)
 
     print(f"\nDone: {downloaded} downloaded, {skipped} skipped, {failed} failed", file=sys.stderr)
 
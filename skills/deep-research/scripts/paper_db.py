@@ -1,8 +1,13 @@
 #!/usr/bin/env python3
 """JSONL paper database management.
 
-Subcommands: add, search, merge, tag, stats, export.
-Deduplication by title similarity (Jaccard on word tokens, threshold 0.8).
+Subcommands: add, search, merge, tag, stats, filter, export, index.
+Deduplication by title similarity (Jaccard on word tokens, threshold 0.8),
+using a prefix-filter token index instead of all-pairs comparison.
+
+`index` builds a SQLite sidecar (paper_db.sqlite next to paper_db.jsonl).
+While it exists, search/filter/stats query it instead of rescanning the
+JSONL, and it is rebuilt automatically whenever the JSONL changes.
 
 Usage:
     python paper_db.py merge --inputs arxiv.jsonl s2.jsonl --output merged.jsonl
@@ -11,20 +16,46 @@ Usage:
     python paper_db.py tag --input paper_db.jsonl --ids "2401.12345" --tags core method
     python paper_db.py add --input paper_db.jsonl --record '{"title":"...", "arxiv_id":"..."}'
     python paper_db.py export --input paper_db.jsonl --format csv
+    python paper_db.py index --input paper_db.jsonl
 """
 
 import argparse
 import csv
-import io
+import functools
+import heapq
 import json
+import math
 import os
-import re
+import sqlite3
 import sys
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from contextlib import closing
+from itertools import islice
+from typing import BinaryIO, TextIO
+
+try:
+    import orjson  # optional: faster JSON parsing/serialization
+except ImportError:
+    orjson = None
+
+from common import dump_record
+
 
+SAVE_BATCH = 1024  # records serialized per write in save_jsonl
 
-def tokenize(text: str) -> set[str]:
-    """Tokenize text into lowercase word set."""
-    return set(re.findall(r"[a-z0-9]+", text.lower()))
+# Byte table keeping [a-z0-9] and mapping every other byte to a space
+TOKEN_TABLE = bytes(b if chr(b) in "abcdefghijklmnopqrstuvwxyz0123456789" else 0x20 for b in range(256))
+
+
+@functools.lru_cache(maxsize=32768)
+def tokenize(text: str) -> frozenset[str]:
+    """Tokenize text into lowercase word set (cached: titles recur across inputs).
+
+    Same tokens as re.findall(r"[a-z0-9]+", text.lower()): non-ASCII characters
+    encode to "?" and become separators like any other non-alphanumeric.
+    """
+    return frozenset(text.lower().encode("ascii", "replace").translate(TOKEN_TABLE).decode("ascii").split())
 
 
 def jaccard(a: set, b: set) -> float:
@@ -34,24 +65,59 @@ def jaccard(a: set, b: set) -> float:
     return len(a & b) / len(a | b)
 
 
-def load_jsonl(path: str) -> list[dict]:
-    """Load records from a JSONL file."""
-    records = []
+def load_record(raw: bytes | str) -> dict:
+    """Parse one JSON record, with json as fallback for NaN/Infinity orjson rejects."""
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(raw)
+
+
+def iter_jsonl(path: str) -> Iterator[dict]:
+    """Yield records from a JSONL file one line at a time."""
     if not os.path.exists(path):
-        return records
-    with open(path, encoding="utf-8") as f:
+        return
+    with open(path, "rb") as f:
         for line in f:
             line = line.strip()
             if line:
-                records.append(json.loads(line))
-    return records
+                yield load_record(line)
+
+
+def prefetch_files(paths: list[str]):
+    """Ask the kernel to start reading files ahead, overlapping disk I/O with parsing."""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_WILLNEED)
+        except OSError:
+            pass
+
+
+def load_jsonl(path: str) -> list[dict]:
+    """Load records from a JSONL file."""
+    return list(iter_jsonl(path))
+
 
+def save_jsonl(records: Iterable[dict], path: str) -> int:
+    """Save records to a JSONL file, returning the number written.
 
-def save_jsonl(records: list[dict], path: str):
-    """Save records to a JSONL file."""
-    with open(path, "w", encoding="utf-8") as f:
-        for rec in records:
-            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    Writes to a temp file first so records may be streamed from the same path.
+    """
+    count = 0
+    tmp_path = path + ".tmp"
+    records = iter(records)
+    with open(tmp_path, "wb") as f:
+        # One joined write per batch instead of one write call per record
+        while batch := list(islice(records, SAVE_BATCH)):
+            f.write(b"".join([dump_record(rec) for rec in batch]))
+            count += len(batch)
+    os.replace(tmp_path, path)
+    return count
 
 
 def get_paper_id(paper: dict) -> str:
@@ -59,11 +125,38 @@ def get_paper_id(paper: dict) -> str:
     return paper.get("arxiv_id") or paper.get("paperId") or ""
 
 
-def deduplicate(records: list[dict], threshold: float = 0.8) -> list[dict]:
-    """Remove duplicate papers by title similarity."""
-    seen_titles: list[set[str]] = []
+def title_prefix(tokens: set[str], threshold: float, doc_freq: Counter | None = None) -> list[str]:
+    """Prefix-filter tokens of a title for Jaccard >= threshold.
+
+    Under one fixed token order (rarest first by doc_freq, or longest first
+    as a cheap proxy for rarity), two sets with Jaccard >= threshold always
+    share a token within their prefixes, so only prefix tokens need
+    indexing/probing.
+    """
+    min_overlap = math.ceil(threshold * len(tokens) - 1e-9)  # err on a longer prefix
+    if doc_freq is None:
+        ordered = sorted(tokens, key=lambda tok: (-len(tok), tok))
+    else:
+        ordered = sorted(tokens, key=lambda tok: (doc_freq[tok], tok))
+    return ordered[:max(len(tokens) - min_overlap + 1, 0)]
+
+
+def iter_unique(records: Iterable[dict], threshold: float = 0.8,
+                doc_freq: Counter | None = None) -> Iterator[dict]:
+    """Yield records that are not duplicates of an earlier one.
+
+    Titles are compared only against earlier titles sharing a prefix token
+    (see title_prefix), which finds exactly the same duplicates as comparing
+    against every earlier title. doc_freq, title token counts over all
+    the records, makes the prefixes the rarest tokens so probes touch
+    short posting lists. Exact token-set repeats (the same paper
+    from arxiv and S2) are caught first by a set lookup.
+    """
+    seen_titles: list[frozenset[str]] = []
+    seen_title_set: set[frozenset[str]] = set()
+    seen_sizes: list[int] = []
+    title_index: dict[str, list[int]] = {}  # prefix token -> seen_titles indices
     seen_ids: set[str] = set()
-    unique = []
 
     for rec in records:
         pid = get_paper_id(rec)
@@ -75,75 +168,177 @@ def deduplicate(records: list[dict], threshold: float = 0.8) -> list[dict]:
 
         # Title similarity check
         title_tokens = tokenize(title)
-        is_dup = False
-        for prev_tokens in seen_titles:
-            if jaccard(title_tokens, prev_tokens) >= threshold:
-                is_dup = True
-                break
+        size = len(title_tokens)
+        if threshold <= 0:
+            # Every pair reaches a non-positive threshold
+            is_dup = bool(seen_titles)
+            prefix = []
+        elif title_tokens and threshold <= 1 and title_tokens in seen_title_set:
+            # Jaccard 1.0 with a kept title
+            continue
+        else:
+            is_dup = False
+            prefix = title_prefix(title_tokens, threshold, doc_freq)
+            checked = set()
+            for tok in prefix:
+                for idx in title_index.get(tok, ()):
+                    if idx in checked:
+                        continue
+                    checked.add(idx)
+                    # Jaccard <= min/max size, so skip pairs whose sizes differ too much
+                    other_size = seen_sizes[idx]
+                    if size < other_size:
+                        if size / other_size < threshold:
+                            continue
+                    elif other_size / size < threshold:
+                        continue
+                    inter = len(title_tokens & seen_titles[idx])
+                    if inter / (size + other_size - inter) >= threshold:
+                        is_dup = True
+                        break
+                if is_dup:
+                    break
 
         if is_dup:
             continue
 
         if pid:
             seen_ids.add(pid)
+        for tok in prefix:
+            title_index.setdefault(tok, []).append(len(seen_titles))
         seen_titles.append(title_tokens)
-        unique.append(rec)
+        seen_title_set.add(title_tokens)
+        seen_sizes.append(size)
+        yield rec
+
 
-    return unique
+def deduplicate(records: Iterable[dict], threshold: float = 0.8) -> list[dict]:
+    """Remove duplicate papers by title similarity."""
+    return list(iter_unique(records, threshold))
 
 
 def merge_databases(inputs: list[str], output: str, threshold: float = 0.8):
     """Merge multiple JSONL files with deduplication."""
-    all_records = []
+    total = 0
+    prefetch_files(inputs)
+
+    # A cheap first pass ranks title tokens so dedup indexes the rarest ones
+    doc_freq = Counter()
     for path in inputs:
-        records = load_jsonl(path)
-        print(f"Loaded {len(records)} from {path}", file=sys.stderr)
-        all_records.extend(records)
+        for rec in iter_jsonl(path):
+            doc_freq.update(tokenize(rec.get("title", "")))
 
-    merged = deduplicate(all_records, threshold)
-    save_jsonl(merged, output)
-    print(f"Merged: {len(all_records)} -> {len(merged)} unique papers -> {output}", file=sys.stderr)
+    def iter_inputs():
+        nonlocal total
+        for path in inputs:
+            count = 0
+            for rec in iter_jsonl(path):
+                count += 1
+                yield rec
+            print(f"Loaded {count} from {path}", file=sys.stderr)
+            total += count
+
+    merged = save_jsonl(iter_unique(iter_inputs(), threshold, doc_freq), output)
+    tokenize.cache_clear()
+    print(f"Merged: {total} -> {merged} unique papers -> {output}", file=sys.stderr)
 
 
 def filter_db(db_path: str, output: str, *, min_score: float = 0.0, max_papers: int = 0,
               require_keywords: list[str] | None = None):
     """Filter papers by affinity_score threshold and optional keyword relevance."""
-    records = load_jsonl(db_path)
-    kept = []
-    for rec in records:
-        score = rec.get("affinity_score")
-        if score is not None and score < min_score:
-            continue
-        if score is None and require_keywords:
-            title_lower = rec.get("title", "").lower()
-            if not any(k in title_lower for k in require_keywords):
+    conn = open_index(db_path)
+    if conn is not None:
+        with closing(conn):
+            total, kept = filter_index(conn, min_score, max_papers, require_keywords)
+        save_jsonl(kept, output)
+        print(f"Filtered: {total} -> {len(kept)} papers -> {output}", file=sys.stderr)
+        return
+
+    total = 0
+
+    def iter_matches():
+        nonlocal total
+        for rec in iter_jsonl(db_path):
+            total += 1
+            score = rec.get("affinity_score")
+            if score is not None and score < min_score:
                 continue
-        kept.append(rec)
+            if score is None and require_keywords:
+                title_lower = rec.get("title", "").lower()
+                if not any(k in title_lower for k in require_keywords):
+                    continue
+            yield rec
 
-    # Sort by score descending (None at end)
-    kept.sort(key=lambda r: -(r.get("affinity_score") or 0))
+    def score_key(rec):
+        return rec.get("affinity_score") or 0
 
-    if max_papers > 0 and len(kept) > max_papers:
-        kept = kept[:max_papers]
+    # Highest score first (None counts as 0); ties keep file order
+    if max_papers > 0:
+        kept = heapq.nlargest(max_papers, iter_matches(), key=score_key)
+    else:
+        kept = sorted(iter_matches(), key=score_key, reverse=True)
 
     save_jsonl(kept, output)
-    print(f"Filtered: {len(records)} -> {len(kept)} papers -> {output}", file=sys.stderr)
+    print(f"Filtered: {total} -> {len(kept)} papers -> {output}", file=sys.stderr)
+
+
+def search_text(rec: dict, field: str) -> str:
+    """Lowercased text of a field as matched by search (lists joined by spaces)."""
+    value = rec.get(field, "")
+    if isinstance(value, list):
+        value = " ".join(str(v) for v in value)
+    return str(value).lower()
 
 
 def search_db(db_path: str, query: str, field: str = "title") -> list[dict]:
     """Search papers by keyword match in a field."""
-    records = load_jsonl(db_path)
     query_lower = query.lower()
-    results = []
-
-    for rec in records:
-        value = rec.get(field, "")
-        if isinstance(value, list):
-            value = " ".join(str(v) for v in value)
-        if query_lower in str(value).lower():
-            results.append(rec)
-
-    return results
+    conn = open_index(db_path) if field in INDEX_TEXT_FIELDS else None
+    if conn is not None:
+        with closing(conn):
+            return search_index(conn, query_lower, field)
+
+    return [rec for rec in iter_jsonl(db_path) if query_lower in search_text(rec, field)]
+
+
+def add_record(db_path: str, record: dict, threshold: float = 0.8) -> int:
+    """Append a paper unless it duplicates one already in the DB.
+
+    Checks the new record against each existing one (ID, then title Jaccard)
+    in one read-only pass, then appends a line instead of rewriting the file.
+    With a sidecar index the checks run against it and it is updated in place.
+    Returns the new number of papers, or 0 if the record was a duplicate.
+    """
+    pid = get_paper_id(record)
+    title_tokens = tokenize(record.get("title", ""))
+    conn = open_index(db_path)
+    if conn is not None:
+        with closing(conn):
+            return add_record_indexed(conn, db_path, record, pid, title_tokens, threshold)
+
+    count = 0
+    for rec in iter_jsonl(db_path):
+        if pid and get_paper_id(rec) == pid:
+            return 0
+        if jaccard(title_tokens, tokenize(rec.get("title", ""))) >= threshold:
+            return 0
+        count += 1
+
+    append_record(db_path, record)
+    return count + 1
+
+
+def append_record(db_path: str, record: dict) -> bytes:
+    """Append one record to a JSONL file, returning the line written."""
+    line = dump_record(record)
+    with open(db_path, "ab+") as f:
+        # Keep the new record on its own line if the file lacks a final newline
+        if f.seek(0, os.SEEK_END):
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+        f.write(line)
+    return line
 
 
 def tag_papers(db_path: str, ids: list[str], tags: list[str]):
@@ -164,79 +359,307 @@ def tag_papers(db_path: str, ids: list[str], tags: list[str]):
 
 def compute_stats(db_path: str) -> dict:
     """Compute statistics about the paper database."""
-    records = load_jsonl(db_path)
-    if not records:
-        return {"total": 0}
-
-    sources = {}
-    years = {}
-    venues = {}
+    conn = open_index(db_path)
+    if conn is not None:
+        with closing(conn):
+            return stats_index(conn)
+
+    total = 0
+    sources = Counter()
+    years = Counter()
+    venues = Counter()
     with_abstract = 0
     with_pdf = 0
     total_citations = 0
-    tags_dist = {}
+    tags_dist = Counter()
     peer_reviewed_count = 0
 
-    for rec in records:
-        src = rec.get("source", "unknown")
-        sources[src] = sources.get(src, 0) + 1
+    for rec in iter_jsonl(db_path):
+        get = rec.get  # bound once: ~10 field reads per record
+        total += 1
+        sources[get("source", "unknown")] += 1
 
-        year = rec.get("year")
+        year = get("year")
         if year:
-            years[year] = years.get(year, 0) + 1
+            years[year] += 1
 
-        venue = rec.get("venue", "")
+        venue = get("venue")
         if venue:
-            venues[venue] = venues.get(venue, 0) + 1
+            venues[venue] += 1
 
-        if rec.get("abstract"):
+        if get("abstract"):
             with_abstract += 1
-        if rec.get("pdf_url") or rec.get("pdf_path"):
+        if get("pdf_url") or get("pdf_path"):
             with_pdf += 1
-        if rec.get("peer_reviewed"):
+        if get("peer_reviewed"):
             peer_reviewed_count += 1
 
-        total_citations += rec.get("citationCount", 0) or 0
+        total_citations += get("citationCount") or 0
+
+        # Plain loop: Counter.update's per-call type checks cost more for 0-3 tags
+        for tag in get("tags") or ():
+            tags_dist[tag] += 1
+
+    return format_stats(total, peer_reviewed_count, sources, years, venues.most_common(10),
+                        with_abstract, with_pdf, total_citations, tags_dist)
 
-        for tag in rec.get("tags", []):
-            tags_dist[tag] = tags_dist.get(tag, 0) + 1
+
+def format_stats(total: int, peer_reviewed_count: int, sources: dict, years: dict,
+                 top_venues: list[tuple], with_abstract: int, with_pdf: int,
+                 total_citations: int | float, tags_dist: dict) -> dict:
+    """Assemble the stats report from counts (years/sources/tags in first-seen order)."""
+    if not total:
+        return {"total": 0}
 
     return {
-        "total": len(records),
+        "total": total,
         "peer_reviewed": peer_reviewed_count,
-        "preprint_only": len(records) - peer_reviewed_count,
-        "sources": sources,
+        "preprint_only": total - peer_reviewed_count,
+        "sources": dict(sources),
         "years": dict(sorted(years.items(), key=lambda x: str(x[0]))),
-        "top_venues": dict(sorted(venues.items(), key=lambda x: -x[1])[:10]),
+        "top_venues": dict(top_venues),
         "with_abstract": with_abstract,
         "with_pdf": with_pdf,
         "total_citations": total_citations,
-        "avg_citations": round(total_citations / len(records), 1),
-        "tags": tags_dist,
+        "avg_citations": round(total_citations / total, 1),
+        "tags": dict(tags_dist),
     }
 
 
-def export_csv(db_path: str) -> str:
-    """Export paper DB as CSV."""
-    records = load_jsonl(db_path)
-    if not records:
-        return ""
+# --- SQLite sidecar index ---
+
+INDEX_TEXT_FIELDS = ("title", "abstract")
+INDEX_VERSION = "2"  # bump when the schema changes; older sidecars are rebuilt
+INDEX_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+-- Compact per-paper fields for filter/stats scans
+CREATE TABLE papers (
+    id INTEGER PRIMARY KEY,  -- line order in the JSONL
+    pid TEXT,                -- get_paper_id(rec), NULL if none
+    affinity_score,
+    source,
+    year,                    -- NULL unless truthy, as stats counts it
+    venue,                   -- NULL unless truthy
+    has_abstract INTEGER,
+    has_pdf INTEGER,
+    peer_reviewed INTEGER,
+    citations,
+    tags TEXT,               -- JSON list, NULL if empty
+    title TEXT               -- search_text(rec, "title")
+);
+CREATE INDEX papers_pid ON papers (pid);
+-- Bulky text kept apart so the scans above stay small
+CREATE TABLE papers_text (
+    id INTEGER PRIMARY KEY,
+    title TEXT,
+    abstract TEXT,           -- search_text(rec, "abstract")
+    record TEXT NOT NULL     -- the JSONL line
+);
+"""
+# Case-sensitive trigrams over the already-lowercased text give exact substring search
+INDEX_FTS = """
+CREATE VIRTUAL TABLE papers_fts USING fts5(
+    title, abstract, content=papers_text, content_rowid=id, tokenize="trigram case_sensitive 1");
+INSERT INTO papers_fts(papers_fts) VALUES ('rebuild');
+"""
 
-    fields = ["arxiv_id", "paperId", "title", "authors", "year", "venue",
-              "citationCount", "pdf_url", "tags", "source"]
 
-    output = io.StringIO()
-    writer = csv.DictWriter(output, fieldnames=fields, extrasaction="ignore")
-    writer.writeheader()
-    for rec in records:
-        row = dict(rec)
-        if isinstance(row.get("authors"), list):
-            row["authors"] = "; ".join(row["authors"])
-        if isinstance(row.get("tags"), list):
-            row["tags"] = "; ".join(row["tags"])
+def index_path(db_path: str) -> str:
+    """Path of the SQLite sidecar for a JSONL DB."""
+    return os.path.splitext(db_path)[0] + ".sqlite"
+
+
+def file_signature(path: str) -> str:
+    """Size and mtime of a file, used to detect a stale index."""
+    st = os.stat(path)
+    return f"{st.st_size}:{st.st_mtime_ns}"
+
+
+def index_row(row_id: int, rec: dict, line: bytes) -> tuple[tuple, tuple]:
+    """(papers row, papers_text row) for one record and its JSONL line."""
+    title = search_text(rec, "title")
+    tags = rec.get("tags", [])
+    return (
+        row_id,
+        get_paper_id(rec) or None,
+        rec.get("affinity_score"),
+        rec.get("source", "unknown"),
+        rec.get("year") or None,
+        rec.get("venue", "") or None,
+        bool(rec.get("abstract")),
+        bool(rec.get("pdf_url") or rec.get("pdf_path")),
+        bool(rec.get("peer_reviewed")),
+        rec.get("citationCount", 0) or 0,
+        json.dumps(tags) if tags else None,
+        title,
+    ), (row_id, title, search_text(rec, "abstract"), line.decode("utf-8"))
+
+
+def insert_index_row(conn: sqlite3.Connection, paper_row: tuple, text_row: tuple):
+    conn.execute("INSERT INTO papers VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", paper_row)
+    conn.execute("INSERT INTO papers_text VALUES (?, ?, ?, ?)", text_row)
+
+
+def index_rows(db_path: str) -> Iterator[tuple[tuple, tuple]]:
+    """Yield (papers row, papers_text row) per JSONL record."""
+    row_id = 0
+    with open(db_path, "rb") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            row_id += 1
+            yield index_row(row_id, load_record(line), line)
+
+
+def build_index(db_path: str) -> int:
+    """(Re)build the SQLite sidecar for a JSONL DB, returning the number of papers."""
+    path = index_path(db_path)
+    tmp_path = path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    signature = file_signature(db_path)  # taken first, so a concurrent write leaves it stale
+
+    with closing(sqlite3.connect(tmp_path)) as conn:
+        conn.executescript(INDEX_SCHEMA)
+        for paper_row, text_row in index_rows(db_path):
+            insert_index_row(conn, paper_row, text_row)
+        try:
+            conn.executescript(INDEX_FTS)
+        except sqlite3.OperationalError:
+            pass  # no FTS5 trigram support: searches scan the papers table instead
+        conn.executemany("INSERT INTO meta VALUES (?, ?)",
+                         [("version", INDEX_VERSION), ("source", signature)])
+        conn.commit()
+        count = conn.execute("SELECT count(*) FROM papers").fetchone()[0]
+
+    os.replace(tmp_path, path)
+    return count
+
+
+def open_index(db_path: str) -> sqlite3.Connection | None:
+    """Open the sidecar index if one exists, rebuilding it if the JSONL changed."""
+    path = index_path(db_path)
+    if not os.path.exists(path) or not os.path.exists(db_path):
+        return None
+    conn = sqlite3.connect(path)
+    try:
+        meta = dict(conn.execute("SELECT key, value FROM meta"))
+    except sqlite3.DatabaseError:
+        meta = {}
+    if meta.get("version") == INDEX_VERSION and meta.get("source") == file_signature(db_path):
+        return conn
+    conn.close()
+    build_index(db_path)
+    return sqlite3.connect(path)
+
+
+def search_index(conn: sqlite3.Connection, query_lower: str, field: str) -> list[dict]:
+    """Substring search on an indexed text field, in file order."""
+    has_fts = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'papers_fts'").fetchone()
+    if has_fts and len(query_lower) >= 3:  # trigrams need 3+ characters
+        phrase = '"' + query_lower.replace('"', '""') + '"'
+        rows = conn.execute(
+            f"SELECT p.record FROM papers_fts JOIN papers_text p ON p.id = papers_fts.rowid"
+            f" WHERE papers_fts MATCH ? AND instr(p.{field}, ?) > 0 ORDER BY p.id",
+            (f"{field} : {phrase}", query_lower))
+    else:
+        rows = conn.execute(f"SELECT record FROM papers_text WHERE instr({field}, ?) > 0 ORDER BY id",
+                            (query_lower,))
+    return [load_record(record) for (record,) in rows]
+
+
+def filter_index(conn: sqlite3.Connection, min_score: float, max_papers: int,
+                 require_keywords: list[str] | None) -> tuple[int, list[dict]]:
+    """filter_db on the index: returns (total papers, kept records in output order)."""
+    unscored = "affinity_score IS NULL"
+    params: list = [min_score]
+    if require_keywords:
+        # Keywords match as given against the lowercased title, like the scan
+        unscored += " AND (" + " OR ".join("instr(title, ?) > 0" for _ in require_keywords) + ")"
+        params.extend(require_keywords)
+    order = "ORDER BY coalesce(affinity_score, 0) DESC, id"
+    sql = f"SELECT id, affinity_score FROM papers WHERE affinity_score >= ? OR ({unscored}) {order}"
+    if max_papers > 0:
+        sql += " LIMIT ?"
+        params.append(max_papers)
+    sql = f"SELECT record FROM ({sql}) JOIN papers_text USING (id) {order}"
+
+    total = conn.execute("SELECT count(*) FROM papers").fetchone()[0]
+    return total, [load_record(record) for (record,) in conn.execute(sql, params)]
+
+
+def add_record_indexed(conn: sqlite3.Connection, db_path: str, record: dict, pid: str,
+                       title_tokens: frozenset[str], threshold: float) -> int:
+    """add_record on the index: known IDs are rejected by an indexed lookup, titles
+    are compared from the compact papers table, and the new row is added in place."""
+    if pid and conn.execute("SELECT 1 FROM papers WHERE pid = ? LIMIT 1", (pid,)).fetchone():
+        return 0
+    for (title,) in conn.execute("SELECT title FROM papers"):
+        if jaccard(title_tokens, tokenize(title)) >= threshold:
+            return 0
+
+    line = append_record(db_path, record)
+    row_id = conn.execute("SELECT coalesce(max(id), 0) + 1 FROM papers").fetchone()[0]
+    paper_row, text_row = index_row(row_id, record, line.strip())
+    insert_index_row(conn, paper_row, text_row)
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'papers_fts'").fetchone():
+        conn.execute("INSERT INTO papers_fts (rowid, title, abstract) VALUES (?, ?, ?)", text_row[:3])
+    conn.execute("UPDATE meta SET value = ? WHERE key = 'source'", (file_signature(db_path),))
+    conn.commit()
+    return conn.execute("SELECT count(*) FROM papers").fetchone()[0]
+
+
+def stats_index(conn: sqlite3.Connection) -> dict:
+    """compute_stats on the index, using SQL aggregates."""
+    total, peer_reviewed_count, with_abstract, with_pdf, total_citations = conn.execute(
+        "SELECT count(*), sum(peer_reviewed), sum(has_abstract), sum(has_pdf), sum(citations)"
+        " FROM papers").fetchone()
+    # ORDER BY min(id) keeps keys in first-seen order, like the scan's Counters
+    sources = dict(conn.execute(
+        "SELECT source, count(*) FROM papers GROUP BY source ORDER BY min(id)"))
+    years = dict(conn.execute(
+        "SELECT year, count(*) FROM papers WHERE year IS NOT NULL GROUP BY year ORDER BY min(id)"))
+    top_venues = conn.execute(
+        "SELECT venue, count(*) FROM papers WHERE venue IS NOT NULL"
+        " GROUP BY venue ORDER BY count(*) DESC, min(id) LIMIT 10").fetchall()
+    tags_dist = Counter()
+    for (tags,) in conn.execute("SELECT tags FROM papers WHERE tags IS NOT NULL ORDER BY id"):
+        tags_dist.update(json.loads(tags))
+    return format_stats(total, peer_reviewed_count or 0, sources, years, top_venues,
+                        with_abstract or 0, with_pdf or 0, total_citations or 0, tags_dist)
+
+
+CSV_FIELDS = ["arxiv_id", "paperId", "title", "authors", "year", "venue",
+              "citationCount", "pdf_url", "tags", "source"]
+CSV_LIST_COLUMNS = (CSV_FIELDS.index("authors"), CSV_FIELDS.index("tags"))  # joined with "; "
+
+
+def export_csv(db_path: str, out: TextIO) -> int:
+    """Stream paper DB as CSV to a text file, returning the number of rows."""
+    writer = None
+    count = 0
+    for rec in iter_jsonl(db_path):
+        if writer is None:
+            # No header for an empty DB
+            writer = csv.writer(out)
+            writer.writerow(CSV_FIELDS)
+        row = [rec.get(k, "") for k in CSV_FIELDS]
+        for i in CSV_LIST_COLUMNS:
+            if isinstance(row[i], list):
+                row[i] = "; ".join(row[i])
         writer.writerow(row)
+        count += 1
+    return count
+
 
-    return output.getvalue()
+def export_jsonl(db_path: str, out: BinaryIO) -> int:
+    """Stream paper DB as JSONL to a binary file, returning the number of records."""
+    count = 0
+    for rec in iter_jsonl(db_path):
+        out.write(dump_record(rec))
+        count += 1
+    return count
 
 
 def main():
@@ -262,7 +685,7 @@ def main():
     p_tag.add_argument("--tags", nargs="+", required=True, help="Tags to add")
 
     # add
-    p_add = sub.add_parser("add", help="Add a paper record")
+    p_add = sub.add_parser("add", help="Add a paper record (exits 1 if it is a duplicate)")
     p_add.add_argument("--input", required=True, help="Paper DB JSONL file")
     p_add.add_argument("--record", required=True, help="JSON string of paper record")
 
@@ -278,6 +701,10 @@ def main():
     p_filter.add_argument("--max-papers", type=int, default=0, help="Maximum number of papers to keep (0=unlimited)")
     p_filter.add_argument("--keywords", nargs="*", help="For papers without score, require these keywords in title")
 
+    # index
+    p_index = sub.add_parser("index", help="Build the SQLite sidecar index used by search/filter/stats")
+    p_index.add_argument("--input", required=True, help="Paper DB JSONL file")
+
     # export
     p_export = sub.add_parser("export", help="Export database")
     p_export.add_argument("--input", required=True, help="Paper DB JSONL file")
@@ -291,20 +718,21 @@ def main():
 
     elif args.command == "search":
         results = search_db(args.input, args.query, args.field)
-        for rec in results:
-            print(json.dumps(rec, ensure_ascii=False))
+        sys.stdout.flush()
+        sys.stdout.buffer.writelines(dump_record(rec) for rec in results)
         print(f"Found {len(results)} matches", file=sys.stderr)
 
     elif args.command == "tag":
         tag_papers(args.input, args.ids, args.tags)
 
     elif args.command == "add":
-        record = json.loads(args.record)
-        records = load_jsonl(args.input)
-        records.append(record)
-        records = deduplicate(records)
-        save_jsonl(records, args.input)
-        print(f"Added record, DB now has {len(records)} papers", file=sys.stderr)
+        record = load_record(args.record)
+        count = add_record(args.input, record)
+        if count:
+            print(f"Added record, DB now has {count} papers", file=sys.stderr)
+        else:
+            print("Skipped record: duplicate of a paper already in the DB", file=sys.stderr)
+            sys.exit(1)
 
     elif args.command == "filter":
         filter_db(args.input, args.output, min_score=args.min_score,
@@ -316,17 +744,26 @@ def main():
 
     elif args.command == "export":
         if args.format == "csv":
-            output = export_csv(args.input)
+            if args.output:
+                with open(args.output, "w", encoding="utf-8", newline="") as f:
+                    export_csv(args.input, f)
+            else:
+                export_csv(args.input, sys.stdout)
         else:
-            records = load_jsonl(args.input)
-            output = "\n".join(json.dumps(r, ensure_ascii=False) for r in records)
+            if args.output:
+                with open(args.output, "wb") as f:
+                    export_jsonl(args.input, f)
+            else:
+                sys.stdout.flush()
+                export_jsonl(args.input, sys.stdout.buffer)
+                sys.stdout.buffer.flush()
 
         if args.output:
-            with open(args.output, "w", encoding="utf-8") as f:
-                f.write(output)
             print(f"Exported to {args.output}", file=sys.stderr)
-        else:
-            print(output)
+
+    elif args.command == "index":
+        count = build_index(args.input)
+        print(f"Indexed {count} papers -> {index_path(args.input)}", file=sys.stderr)
 
 
 if __name__ == "__main__":
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """Search arxiv via the Atom API and output JSONL paper metadata.
 
-Self-contained: uses only stdlib (urllib, xml.etree).
+Self-contained: uses only stdlib (urllib, xml.etree); orjson is used if installed.
 
 Usage:
     python search_arxiv.py --query "long context reasoning" --max-results 50
@@ -10,16 +10,25 @@ Usage:
 """
 
 import argparse
-import json
+import io
 import sys
 import time
 import urllib.parse
-import urllib.request
 import xml.etree.ElementTree as ET
 from datetime import datetime
 
+from common import dump_record, http_fetch
+
 ARXIV_API = "http://export.arxiv.org/api/query"
-NS = {"atom": "http://www.w3.org/2005/Atom", "arxiv": "http://arxiv.org/schemas/atom"}
+REQUEST_INTERVAL = 3.0  # arxiv rate limit: 1 request per 3 seconds
+ATOM = "{http://www.w3.org/2005/Atom}"
+ARXIV = "{http://arxiv.org/schemas/atom}"
+ENTRY_TAG = ATOM + "entry"
+AUTHOR_TAG = ATOM + "author"
+NAME_TAG = ATOM + "name"
+CATEGORY_TAG = ATOM + "category"
+LINK_TAG = ATOM + "link"
+PRIMARY_CATEGORY_TAG = ARXIV + "primary_category"
 
 SORT_MAP = {
     "relevance": "relevance",
@@ -55,65 +64,72 @@ def fetch_results(
         "sortOrder": sort_order,
     }
     url = f"{ARXIV_API}?{urllib.parse.urlencode(params)}"
-    req = urllib.request.Request(url, headers={"User-Agent": "deep-research/1.0"})
-    with urllib.request.urlopen(req, timeout=30) as resp:
-        return resp.read()
+    return http_fetch(url, {"User-Agent": "deep-research/1.0"})
 
 
 def parse_entry(entry: ET.Element) -> dict:
     """Parse a single Atom entry into a paper record."""
-    def text(tag: str, ns: str = "atom") -> str:
-        el = entry.find(f"{ns}:{tag}", NS) if ns else entry.find(tag)
-        return el.text.strip() if el is not None and el.text else ""
+    # One pass over the children; texts keeps the first element of each tag
+    texts = {}
+    authors = []
+    primary_categories = []
+    other_categories = []
+    pdf_url = None
+    for el in entry:
+        tag = el.tag
+        if tag == AUTHOR_TAG:
+            name_el = el.find(NAME_TAG)
+            if name_el is not None and name_el.text:
+                authors.append(name_el.text.strip())
+        elif tag == CATEGORY_TAG:
+            other_categories.append(el.get("term", ""))
+        elif tag == PRIMARY_CATEGORY_TAG:
+            primary_categories.append(el.get("term", ""))
+        elif tag == LINK_TAG:
+            if pdf_url is None and el.get("title") == "pdf":
+                pdf_url = el.get("href", "")
+        elif tag not in texts:
+            texts[tag] = el.text
+
+    def text(tag: str) -> str:
+        value = texts.get(tag)
+        return value.strip() if value else ""
 
     # Extract arxiv ID from the entry id URL
-    entry_id = text("id")
+    entry_id = text(ATOM + "id")
     arxiv_id = entry_id.split("/abs/")[-1] if "/abs/" in entry_id else entry_id
 
-    # Authors
-    authors = []
-    for author_el in entry.findall("atom:author", NS):
-        name_el = author_el.find("atom:name", NS)
-        if name_el is not None and name_el.text:
-            authors.append(name_el.text.strip())
-
-    # Categories
+    # Categories: primary first, then the rest without repeats
     categories = []
-    for cat_el in entry.findall("arxiv:primary_category", NS):
-        term = cat_el.get("term", "")
+    for term in primary_categories:
         if term:
             categories.append(term)
-    for cat_el in entry.findall("atom:category", NS):
-        term = cat_el.get("term", "")
+    for term in other_categories:
         if term and term not in categories:
             categories.append(term)
 
     # PDF link
-    pdf_url = ""
-    for link_el in entry.findall("atom:link", NS):
-        if link_el.get("title") == "pdf":
-            pdf_url = link_el.get("href", "")
-            break
     if not pdf_url and arxiv_id:
         pdf_url = f"https://arxiv.org/pdf/{arxiv_id}"
+    pdf_url = pdf_url or ""
 
     # Comment (often contains page count, conference info)
-    comment = text("comment", "arxiv")
+    comment = text(ARXIV + "comment")
 
     # Abstract: normalize whitespace
-    abstract = " ".join(text("summary").split())
+    abstract = " ".join(text(ATOM + "summary").split())
 
-    published = text("published")
+    published = text(ATOM + "published")
     year = int(published[:4]) if len(published) >= 4 else None
 
     return {
         "arxiv_id": arxiv_id,
-        "title": " ".join(text("title").split()),
+        "title": " ".join(text(ATOM + "title").split()),
         "authors": authors,
         "abstract": abstract,
         "year": year,
         "published": published,
-        "updated": text("updated"),
+        "updated": text(ATOM + "updated"),
         "categories": categories,
         "pdf_url": pdf_url,
         "comment": comment,
@@ -121,6 +137,14 @@ def parse_entry(entry: ET.Element) -> dict:
     }
 
 
+def iter_entries(xml_data: bytes):
+    """Yield parsed paper records from an Atom feed, freeing each entry once parsed."""
+    for _, elem in ET.iterparse(io.BytesIO(xml_data)):
+        if elem.tag == ENTRY_TAG:
+            yield parse_entry(elem)
+            elem.clear()
+
+
 def search(
     keywords: str,
     categories: list[str] | None = None,
@@ -134,22 +158,25 @@ def search(
     page_size = min(max_results, 100)  # arxiv max per request
     all_papers = []
     seen_ids = set()
+    next_request = 0.0
 
     for start in range(0, max_results, page_size):
         fetch_count = min(page_size, max_results - start)
+        # Rate limit counts from request start, so download and parsing time
+        # of the previous page overlaps the mandatory wait
+        wait = next_request - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        next_request = time.monotonic() + REQUEST_INTERVAL
         try:
             xml_data = fetch_results(query, start, fetch_count, sort_by)
         except Exception as e:
             print(f"Warning: fetch failed at offset {start}: {e}", file=sys.stderr)
             break
 
-        root = ET.fromstring(xml_data)
-        entries = root.findall("atom:entry", NS)
-        if not entries:
-            break
-
-        for entry in entries:
-            paper = parse_entry(entry)
+        n_entries = 0
+        for paper in iter_entries(xml_data):
+            n_entries += 1
             if not paper["title"] or paper["arxiv_id"] in seen_ids:
                 continue
 
@@ -164,9 +191,8 @@ def search(
             seen_ids.add(paper["arxiv_id"])
             all_papers.append(paper)
 
-        # Respect rate limit: 1 request per 3 seconds
-        if start + page_size < max_results:
-            time.sleep(3)
+        if not n_entries:
+            break
 
     return all_papers
 
@@ -191,13 +217,19 @@ def main():
         end_date=args.end_date,
     )
 
-    out = open(args.output, "w") if args.output else sys.stdout
+    if args.output:
+        out = open(args.output, "wb")
+    else:
+        sys.stdout.flush()
+        out = sys.stdout.buffer
     try:
         for paper in papers:
-            out.write(json.dumps(paper, ensure_ascii=False) + "\n")
+            out.write(dump_record(paper))
     finally:
         if args.output:
             out.close()
+        else:
+            out.flush()
 
     print(f"Found {len(papers)} papers", file=sys.stderr)
 
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 """Search Semantic Scholar Graph API and output JSONL paper metadata.
 
-Self-contained: uses only stdlib (urllib, json).
+Self-contained: uses only stdlib (urllib, json); orjson is used if installed.
 
 Usage:
     python search_semantic_scholar.py --query "long horizon reasoning" --max-results 100
@@ -10,15 +10,26 @@ Usage:
 """
 
 import argparse
+import functools
 import json
+import re
 import sys
 import time
+import urllib.error
 import urllib.parse
-import urllib.request
+
+try:
+    import orjson  # optional: faster JSON parsing/serialization
+except ImportError:
+    orjson = None
+
+from common import dump_record, http_fetch
 
 S2_API = "https://api.semanticscholar.org/graph/v1"
 FIELDS = "title,authors,abstract,year,venue,citationCount,externalIds,url,referenceCount,publicationDate"
 SEARCH_LIMIT = 100  # S2 max per request
+BATCH_LIMIT = 500  # S2 max IDs per /paper/batch request
+REQUEST_INTERVAL = 0.5  # seconds between paginated requests (public API)
 
 # Top-tier AI/ML conferences (peer-reviewed)
 TOP_CONFERENCES = {
@@ -58,44 +69,46 @@ VENUE_ALIASES = {
     "corl": "CoRL",
 }
 
+# Any conference alias, or a journal-style word, marks a venue as peer-reviewed
+PEER_REVIEWED_RE = re.compile("|".join(map(re.escape, [*VENUE_ALIASES, "journal", "transactions", "review"])))
 
-def is_peer_reviewed(venue: str) -> bool:
-    """Check if a paper's venue is a recognized peer-reviewed conference."""
-    if not venue:
-        return False
-    venue_lower = venue.lower()
-    for alias in VENUE_ALIASES:
-        if alias in venue_lower:
-            return True
-    # Also check for "journal" or "transactions" as peer-reviewed
-    if any(kw in venue_lower for kw in ("journal", "transactions", "review")):
-        return True
-    return False
 
+@functools.lru_cache(maxsize=None)
+def classify_venue(venue: str) -> tuple[str, bool]:
+    """Return (canonical venue name, peer-reviewed?) for a raw venue string.
 
-def normalize_venue(venue: str) -> str:
-    """Normalize venue name to canonical form."""
+    S2 venues repeat heavily, so each distinct string is lowercased and
+    matched once and the result cached for the rest of the run.
+    """
     if not venue:
-        return ""
+        return "", False
     venue_lower = venue.lower()
+    if PEER_REVIEWED_RE.search(venue_lower) is None:
+        return venue, False  # no alias can match either
     for alias, canonical in VENUE_ALIASES.items():
         if alias in venue_lower:
-            return canonical
-    return venue
+            return canonical, True
+    return venue, True
 
 
-def s2_request(url: str, api_key: str | None = None) -> dict:
-    """Make a request to the Semantic Scholar API with retry logic."""
+def s2_request(url: str, api_key: str | None = None, body: dict | None = None) -> dict | list:
+    """Make a request to the Semantic Scholar API with retry logic.
+
+    A JSON body, if given, is sent as a POST.
+    """
     headers = {"User-Agent": "deep-research/1.0"}
     if api_key:
         headers["x-api-key"] = api_key
 
-    req = urllib.request.Request(url, headers=headers)
+    data = None
+    if body is not None:
+        data = orjson.dumps(body) if orjson is not None else json.dumps(body).encode("utf-8")
+        headers["Content-Type"] = "application/json"
 
     for attempt in range(3):
         try:
-            with urllib.request.urlopen(req, timeout=30) as resp:
-                return json.loads(resp.read())
+            raw = http_fetch(url, headers, data)
+            return orjson.loads(raw) if orjson is not None else json.loads(raw)
         except urllib.error.HTTPError as e:
             if e.code == 429:
                 wait = 2 ** (attempt + 1)
@@ -132,7 +145,7 @@ def parse_paper(data: dict) -> dict | None:
     abstract = data.get("abstract", "") or ""
 
     venue = data.get("venue", "") or ""
-    reviewed = is_peer_reviewed(venue)
+    venue_normalized, reviewed = classify_venue(venue)
 
     return {
         "paperId": data.get("paperId", ""),
@@ -142,7 +155,7 @@ def parse_paper(data: dict) -> dict | None:
         "abstract": " ".join(abstract.split()),
         "year": data.get("year"),
         "venue": venue,
-        "venue_normalized": normalize_venue(venue),
+        "venue_normalized": venue_normalized,
         "peer_reviewed": reviewed,
         "citationCount": data.get("citationCount", 0) or 0,
         "referenceCount": data.get("referenceCount", 0) or 0,
@@ -175,7 +188,14 @@ def search_papers(
     fetch_max = max_results * fetch_multiplier
 
     offset = 0
+    next_request = 0.0
     while offset < fetch_max and len(all_papers) < max_results:
+        # Rate limit counts from request start, so parsing overlaps the wait
+        wait = next_request - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        next_request = time.monotonic() + REQUEST_INTERVAL
+
         limit = min(SEARCH_LIMIT, fetch_max - offset)
         params = {
             "query": query,
@@ -233,21 +253,35 @@ def search_papers(
         if offset >= total:
             break
 
-        # Rate limit: ~10 requests per second for public API
-        time.sleep(0.5)
-
     return all_papers
 
 
+def get_papers_batch(paper_ids: list[str], api_key: str | None = None,
+                     batch_size: int = BATCH_LIMIT) -> list[dict]:
+    """Get detailed info for many papers (S2 paperId or arxiv:<id>), one request per batch.
+
+    Unknown IDs and failed batches are skipped.
+    """
+    url = f"{S2_API}/paper/batch?fields={FIELDS}"
+    results = []
+    for start in range(0, len(paper_ids), batch_size):
+        chunk = paper_ids[start:start + batch_size]
+        try:
+            items = s2_request(url, api_key, body={"ids": chunk})
+        except Exception as e:
+            print(f"Warning: batch fetch failed for {len(chunk)} papers: {e}", file=sys.stderr)
+            continue
+        for item in items or []:
+            paper = parse_paper(item)  # None for unknown IDs
+            if paper:
+                results.append(paper)
+    return results
+
+
 def get_paper_details(paper_id: str, api_key: str | None = None) -> dict | None:
     """Get detailed info for a single paper by S2 paperId or arxiv:<id>."""
-    url = f"{S2_API}/paper/{urllib.parse.quote(paper_id, safe='')}?fields={FIELDS}"
-    try:
-        data = s2_request(url, api_key)
-        return parse_paper(data)
-    except Exception as e:
-        print(f"Warning: failed to fetch {paper_id}: {e}", file=sys.stderr)
-        return None
+    papers = get_papers_batch([paper_id], api_key)
+    return papers[0] if papers else None
 
 
 def get_citations(paper_id: str, max_results: int = 50, api_key: str | None = None) -> list[dict]:
@@ -336,13 +370,19 @@ def main():
             api_key=args.api_key,
         )
 
-    out = open(args.output, "w") if args.output else sys.stdout
+    if args.output:
+        out = open(args.output, "wb")
+    else:
+        sys.stdout.flush()
+        out = sys.stdout.buffer
     try:
         for paper in papers:
-            out.write(json.dumps(paper, ensure_ascii=False) + "\n")
+            out.write(dump_record(paper))
     finally:
         if args.output:
             out.close()
+        else:
+            out.flush()
 
     print(f"Found {len(papers)} papers", file=sys.stderr)
 
@@ -11,92 +11,161 @@ Usage:
     python design_experiments.py --plan research_plan.json --output experiment_design.json
     python design_experiments.py --method "contrastive learning" --task "image classification" --output design.json
     python design_experiments.py --plan plan.json --format markdown
+    python design_experiments.py --plan plan.json --emit-commands "python train.py" > runs.sh
 """
 
 import argparse
+import itertools
 import json
+import math
 import os
+import random
+import shlex
 import sys
-
-
-DEFAULT_HYPERPARAMS = {
-    "learning_rate": [1e-4, 3e-4, 1e-3],
-    "batch_size": [16, 32, 64],
-    "epochs": [50, 100],
-    "weight_decay": [0, 1e-4, 1e-2],
-    "dropout": [0.0, 0.1, 0.3],
-}
-
-DEFAULT_METRICS = {
-    "classification": ["accuracy", "f1_macro", "precision", "recall", "auroc"],
-    "regression": ["mse", "mae", "r2", "rmse"],
-    "generation": ["bleu", "rouge_l", "meteor", "perplexity"],
-    "detection": ["map", "map50", "precision", "recall", "f1"],
-    "segmentation": ["iou", "dice", "pixel_accuracy"],
-    "retrieval": ["mrr", "ndcg", "recall_at_k", "precision_at_k"],
-    "general": ["accuracy", "f1", "loss"],
-}
-
-STAGE_TEMPLATES = [
-    {
+from array import array
+from collections.abc import Iterator
+from itertools import islice
+from types import MappingProxyType
+
+
+# Read-only defaults, shared by every design generated in this process
+DEFAULT_HYPERPARAMS = MappingProxyType({
+    "learning_rate": (1e-4, 3e-4, 1e-3),
+    "batch_size": (16, 32, 64),
+    "epochs": (50, 100),
+    "weight_decay": (0, 1e-4, 1e-2),
+    "dropout": (0.0, 0.1, 0.3),
+})
+
+DEFAULT_METRICS = MappingProxyType({
+    "classification": ("accuracy", "f1_macro", "precision", "recall", "auroc"),
+    "regression": ("mse", "mae", "r2", "rmse"),
+    "generation": ("bleu", "rouge_l", "meteor", "perplexity"),
+    "detection": ("map", "map50", "precision", "recall", "f1"),
+    "segmentation": ("iou", "dice", "pixel_accuracy"),
+    "retrieval": ("mrr", "ndcg", "recall_at_k", "precision_at_k"),
+    "general": ("accuracy", "f1", "loss"),
+})
+
+STAGE_TEMPLATES = (
+    MappingProxyType({
         "name": "initial_implementation",
         "description": "Get a basic working implementation",
-        "goals": [
+        "goals": (
             "Implement core method",
             "Run on simplest dataset",
             "Verify training loop works",
-        ],
+        ),
         "max_iterations": 5,
         "completion_criteria": "Working implementation with non-trivial performance",
-    },
-    {
+    }),
+    MappingProxyType({
         "name": "baseline_tuning",
         "description": "Tune hyperparameters and establish baselines",
-        "goals": [
+        "goals": (
             "Tune learning rate and batch size",
             "Compare against at least 2 baselines",
             "Test on at least 2 datasets",
-        ],
+        ),
         "max_iterations": 10,
         "completion_criteria": "Stable training, improvement over baselines",
-    },
-    {
+    }),
+    MappingProxyType({
         "name": "creative_research",
         "description": "Explore novel improvements",
-        "goals": [
+        "goals": (
             "Try architectural modifications",
             "Explore loss function variants",
             "Test on at least 3 datasets",
-        ],
+        ),
         "max_iterations": 15,
         "completion_criteria": "Demonstrated novel improvement",
-    },
-    {
+    }),
+    MappingProxyType({
         "name": "ablation_studies",
         "description": "Systematic component analysis",
-        "goals": [
+        "goals": (
             "Ablate each proposed component",
             "Test sensitivity to hyperparameters",
             "Run with multiple random seeds",
-        ],
+        ),
         "max_iterations": 10,
         "completion_criteria": "All planned ablations completed",
-    },
-]
+    }),
+)
 
 
 def generate_ablation_matrix(components: list[str]) -> list[dict]:
     """Generate ablation study matrix from component list."""
-    ablations = [{"name": "Full Model", "components": {c: True for c in components}}]
+    full = dict.fromkeys(components, True)
+    ablations = [{"name": "Full Model", "components": full}]
     for comp in components:
-        ablation = {
-            "name": f"w/o {comp}",
-            "components": {c: (c != comp) for c in components},
-        }
-        ablations.append(ablation)
+        # Copy the full row (a C-level dict copy) and flip the one ablated flag
+        without = full.copy()
+        without[comp] = False
+        ablations.append({"name": f"w/o {comp}", "components": without})
     return ablations
 
 
+def iter_configs(hp_grid: dict) -> Iterator[dict]:
+    """Lazily yield each hyperparameter config in the grid's Cartesian product."""
+    keys = list(hp_grid)
+    for combo in itertools.product(*(hp_grid[k] for k in keys)):
+        yield dict(zip(keys, combo))
+
+
+def config_decoder(hp_grid: dict):
+    """Return a function mapping a position in the grid's Cartesian product
+    (itertools.product order) to its config."""
+    keys = list(hp_grid)
+    radices = [(len(hp_grid[k]), hp_grid[k]) for k in reversed(keys)]
+
+    def config_at(index: int) -> dict:
+        combo = []
+        for size, vals in radices:
+            index, pos = divmod(index, size)
+            combo.append(vals[pos])
+        combo.reverse()
+        return dict(zip(keys, combo))
+
+    return config_at
+
+
+def iter_config_batches(hp_grid: dict, batch_size: int = 1,
+                        shuffle_seed: int | None = None) -> Iterator[tuple[int, list[dict]]]:
+    """Yield (batch index, configs) covering the grid, batch_size configs at a time.
+
+    With a shuffle_seed the configs come in a seeded random order, so a sweep
+    stopped early has still sampled the whole grid rather than one corner.
+    Only an array of indices is shuffled; configs are built as they are yielded.
+    """
+    if shuffle_seed is None:
+        configs = iter_configs(hp_grid)
+    else:
+        order = array("Q", range(math.prod(map(len, hp_grid.values()))))
+        random.Random(shuffle_seed).shuffle(order)
+        configs = map(config_decoder(hp_grid), order)
+    batch_size = max(batch_size, 1)
+    batch_index = 0
+    while batch := list(islice(configs, batch_size)):
+        yield batch_index, batch
+        batch_index += 1
+
+
+def iter_commands(command: str, hp_grid: dict, batch_size: int = 1,
+                  shuffle_seed: int | None = None) -> Iterator[str]:
+    """Yield one shell command per config, passing each parameter as --name value.
+
+    Batches of more than one config are headed by a '# batch N' comment line.
+    """
+    for batch_index, batch in iter_config_batches(hp_grid, batch_size, shuffle_seed):
+        if batch_size > 1:
+            yield f"# batch {batch_index}"
+        for config in batch:
+            args = " ".join(f"--{k} {shlex.quote(str(v))}" for k, v in config.items())
+            yield f"{command} {args}" if args else command
+
+
 def generate_design(plan: dict) -> dict:
     """Generate a full experiment design from a research plan."""
     method = plan.get("method", "proposed method")
@@ -106,6 +175,8 @@ def generate_design(plan: dict) -> dict:
     datasets = plan.get("datasets", [])
     custom_metrics = plan.get("metrics", [])
     num_seeds = plan.get("num_seeds", 3)
+    grid_batch_size = max(plan.get("grid_batch_size", 1), 1)
+    shuffle_seed = plan.get("shuffle_seed", 0)  # null keeps Cartesian-product order
 
     # Select metrics
     metrics = custom_metrics or DEFAULT_METRICS.get(task_type, DEFAULT_METRICS["general"])
@@ -114,17 +185,15 @@ def generate_design(plan: dict) -> dict:
     hp_grid = plan.get("hyperparameter_grid", {})
     if not hp_grid:
         hp_grid = {
-            "learning_rate": DEFAULT_HYPERPARAMS["learning_rate"],
-            "batch_size": DEFAULT_HYPERPARAMS["batch_size"],
+            "learning_rate": list(DEFAULT_HYPERPARAMS["learning_rate"]),
+            "batch_size": list(DEFAULT_HYPERPARAMS["batch_size"]),
         }
 
     # Generate ablation matrix
     ablations = generate_ablation_matrix(components)
 
     # Compute total experiments estimate
-    n_hp_configs = 1
-    for vals in hp_grid.values():
-        n_hp_configs *= len(vals)
+    n_hp_configs = math.prod(map(len, hp_grid.values()))  # 1 for an empty grid
     n_datasets = max(len(datasets), 1)
     n_ablations = len(ablations)
     n_baselines = max(len(baselines), 1)
@@ -133,7 +202,7 @@ def generate_design(plan: dict) -> dict:
     design = {
         "method": method,
         "task_type": task_type,
-        "stages": STAGE_TEMPLATES,
+        "stages": [dict(stage) for stage in STAGE_TEMPLATES],  # json can't encode mappingproxy
         "baselines": baselines,
         "datasets": datasets,
         "metrics": metrics,
@@ -143,6 +212,11 @@ def generate_design(plan: dict) -> dict:
         "hyperparameter_grid": hp_grid,
         "num_seeds": num_seeds,
         "estimated_total_runs": total_runs,
+        "grid_schedule": {
+            "batch_size": grid_batch_size,
+            "shuffle_seed": shuffle_seed,
+            "num_batches": math.ceil(n_hp_configs / grid_batch_size),
+        },
         "evaluation_protocol": {
             "report_mean_std": True,
             "statistical_test": "paired_ttest" if num_seeds >= 3 else "none",
@@ -192,15 +266,17 @@ def format_markdown(design: dict) -> str:
     lines.append(header)
     lines.append(sep)
     for ab in design["ablation_matrix"]:
-        row = f"| {ab['name']} | "
-        row += " | ".join("Y" if ab["components"][c] else "N" for c in comps)
-        row += " |"
-        lines.append(row)
+        flags = ab["components"]
+        cells = " | ".join(["Y" if flags[c] else "N" for c in comps])
+        lines.append(f"| {ab['name']} | {cells} |")
     lines.append("")
 
     lines.append("## Hyperparameter Grid\n")
     for param, vals in design["hyperparameter_grid"].items():
         lines.append(f"- {param}: {vals}")
+    schedule = design["grid_schedule"]
+    order = "product order" if schedule["shuffle_seed"] is None else f"shuffle seed {schedule['shuffle_seed']}"
+    lines.append(f"- Schedule: {schedule['num_batches']} batches of {schedule['batch_size']} ({order})")
     lines.append("")
 
     lines.append(f"## Summary\n")
@@ -219,6 +295,10 @@ def main():
     parser.add_argument("--format", choices=["json", "markdown"], default="json",
                         help="Output format (default: json)")
     parser.add_argument("--output", "-o", help="Output file")
+    parser.add_argument("--emit-commands", metavar="CMD",
+                        help="Instead of the design, write one 'CMD --param value ...' line "
+                             "per hyperparameter config, ordered and batched by the plan's "
+                             "shuffle_seed and grid_batch_size")
     args = parser.parse_args()
 
     if args.plan and os.path.exists(args.plan):
@@ -235,17 +315,27 @@ def main():
 
     design = generate_design(plan)
 
-    if args.format == "markdown":
-        output = format_markdown(design)
-    else:
-        output = json.dumps(design, indent=2, ensure_ascii=False)
+    def write(out):
+        if args.emit_commands:
+            schedule = design["grid_schedule"]
+            for line in iter_commands(args.emit_commands, design["hyperparameter_grid"],
+                                      schedule["batch_size"], schedule["shuffle_seed"]):
+                out.write(line + "\n")
+        elif args.format == "markdown":
+            out.write(format_markdown(design))
+        else:
+            # Stream the JSON to the file instead of building one big string
+            json.dump(design, out, indent=2, ensure_ascii=False)
 
     if args.output:
         with open(args.output, "w", encoding="utf-8") as f:
-            f.write(output)
-        print(f"Design written to {args.output}", file=sys.stderr)
+            write(f)
+        what = "Commands" if args.emit_commands else "Design"
+        print(f"{what} written to {args.output}", file=sys.stderr)
     else:
-        print(output)
+        write(sys.stdout)
+        if not args.emit_commands:
+            sys.stdout.write("\n")
 
 
 if __name__ == "__main__":
@@ -20,7 +20,9 @@ Usage:
 """
 
 import argparse
+import functools
 import sys
+from string import Template
 
 PREAMBLE = '''import matplotlib
 matplotlib.use('Agg')
@@ -51,8 +53,10 @@ plt.rcParams.update({
 COLORS = ['#2196F3', '#FF5722', '#4CAF50', '#FFC107', '#9C27B0', '#607D8B', '#E91E63', '#00BCD4']
 '''
 
+# Figure bodies; PREAMBLE is prepended only for the type being written.
+# ${name} is the output figure filename (filled in by render_template).
 TEMPLATES = {
-    "bar": PREAMBLE + '''
+    "bar": '''
 # === Baseline Comparison Bar Chart ===
 fig, ax = plt.subplots(figsize=(7, 4.5))
 
@@ -70,12 +74,12 @@ for bar, score in zip(bars, scores):
             f'{score:.1f}', ha='center', va='bottom', fontsize=9)
 
 plt.tight_layout()
-plt.savefig('OUTPUT_NAME.png', dpi=300, bbox_inches='tight')
-plt.savefig('OUTPUT_NAME.pdf', bbox_inches='tight')
+plt.savefig('${name}.png', dpi=300, bbox_inches='tight')
+plt.savefig('${name}.pdf', bbox_inches='tight')
 print("Figure saved.")
 ''',
 
-    "training-curve": PREAMBLE + '''
+    "training-curve": '''
 # === Training Curves (Loss + Accuracy) ===
 fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(10, 4))
 
@@ -101,12 +105,12 @@ ax2.legend()
 ax2.set_title('Accuracy')
 
 plt.tight_layout()
-plt.savefig('OUTPUT_NAME.png', dpi=300, bbox_inches='tight')
-plt.savefig('OUTPUT_NAME.pdf', bbox_inches='tight')
+plt.savefig('${name}.png', dpi=300, bbox_inches='tight')
+plt.savefig('${name}.pdf', bbox_inches='tight')
 print("Figure saved.")
 ''',
 
-    "heatmap": PREAMBLE + '''
+    "heatmap": '''
 import seaborn as sns
 
 # === Heatmap / Confusion Matrix ===
@@ -124,12 +128,12 @@ ax.set_ylabel('True')
 ax.set_title('Confusion Matrix')
 
 plt.tight_layout()
-plt.savefig('OUTPUT_NAME.png', dpi=300, bbox_inches='tight')
-plt.savefig('OUTPUT_NAME.pdf', bbox_inches='tight')
+plt.savefig('${name}.png', dpi=300, bbox_inches='tight')
+plt.savefig('${name}.pdf', bbox_inches='tight')
 print("Figure saved.")
 ''',
 
-    "ablation": PREAMBLE + '''
+    "ablation": '''
 # === Ablation Study Grouped Bar Chart ===
 fig, ax = plt.subplots(figsize=(8, 4.5))
 
@@ -154,12 +158,12 @@ ax.legend(loc='upper right', fontsize=9)
 ax.set_ylim(80, 95)
 
 plt.tight_layout()
-plt.savefig('OUTPUT_NAME.png', dpi=300, bbox_inches='tight')
-plt.savefig('OUTPUT_NAME.pdf', bbox_inches='tight')
+plt.savefig('${name}.png', dpi=300, bbox_inches='tight')
+plt.savefig('${name}.pdf', bbox_inches='tight')
 print("Figure saved.")
 ''',
 
-    "line": PREAMBLE + '''
+    "line": '''
 # === Multi-Line Comparison Plot ===
 fig, ax = plt.subplots(figsize=(7, 4.5))
 
@@ -180,12 +184,12 @@ ax.set_ylabel('Y Axis Label')
 ax.legend()
 
 plt.tight_layout()
-plt.savefig('OUTPUT_NAME.png', dpi=300, bbox_inches='tight')
-plt.savefig('OUTPUT_NAME.pdf', bbox_inches='tight')
+plt.savefig('${name}.png', dpi=300, bbox_inches='tight')
+plt.savefig('${name}.pdf', bbox_inches='tight')
 print("Figure saved.")
 ''',
 
-    "scatter": PREAMBLE + '''
+    "scatter": '''
 # === Scatter Plot with Regression Line ===
 fig, ax = plt.subplots(figsize=(6, 5))
 
@@ -204,12 +208,12 @@ ax.set_ylabel('Y Variable')
 ax.legend()
 
 plt.tight_layout()
-plt.savefig('OUTPUT_NAME.png', dpi=300, bbox_inches='tight')
-plt.savefig('OUTPUT_NAME.pdf', bbox_inches='tight')
+plt.savefig('${name}.png', dpi=300, bbox_inches='tight')
+plt.savefig('${name}.pdf', bbox_inches='tight')
 print("Figure saved.")
 ''',
 
-    "radar": PREAMBLE + '''
+    "radar": '''
 # === Radar / Spider Chart (Multi-Metric Comparison) ===
 fig, ax = plt.subplots(figsize=(6, 6), subplot_kw=dict(polar=True))
 
@@ -236,12 +240,12 @@ ax.set_ylim(70, 100)
 ax.legend(loc='upper right', bbox_to_anchor=(1.3, 1.1))
 
 plt.tight_layout()
-plt.savefig('OUTPUT_NAME.png', dpi=300, bbox_inches='tight')
-plt.savefig('OUTPUT_NAME.pdf', bbox_inches='tight')
+plt.savefig('${name}.png', dpi=300, bbox_inches='tight')
+plt.savefig('${name}.pdf', bbox_inches='tight')
 print("Figure saved.")
 ''',
 
-    "violin": PREAMBLE + '''
+    "violin": '''
 # === Violin Plot (Distribution Comparison) ===
 fig, ax = plt.subplots(figsize=(8, 5))
 
@@ -267,12 +271,12 @@ ax.set_xticklabels(list(data.keys()))
 ax.set_ylabel('Accuracy (%)')
 
 plt.tight_layout()
-plt.savefig('OUTPUT_NAME.png', dpi=300, bbox_inches='tight')
-plt.savefig('OUTPUT_NAME.pdf', bbox_inches='tight')
+plt.savefig('${name}.png', dpi=300, bbox_inches='tight')
+plt.savefig('${name}.pdf', bbox_inches='tight')
 print("Figure saved.")
 ''',
 
-    "tsne": PREAMBLE + '''
+    "tsne": '''
 from sklearn.manifold import TSNE
 
 # === t-SNE Embedding Visualization ===
@@ -302,12 +306,12 @@ ax.set_ylabel('t-SNE dim 2')
 ax.legend(markerscale=2)
 
 plt.tight_layout()
-plt.savefig('OUTPUT_NAME.png', dpi=300, bbox_inches='tight')
-plt.savefig('OUTPUT_NAME.pdf', bbox_inches='tight')
+plt.savefig('${name}.png', dpi=300, bbox_inches='tight')
+plt.savefig('${name}.pdf', bbox_inches='tight')
 print("Figure saved.")
 ''',
 
-    "attention": PREAMBLE + '''
+    "attention": '''
 import seaborn as sns
 
 # === Attention Heatmap ===
@@ -329,13 +333,19 @@ ax.set_ylabel('Query tokens')
 ax.set_title('Attention Weights')
 
 plt.tight_layout()
-plt.savefig('OUTPUT_NAME.png', dpi=300, bbox_inches='tight')
-plt.savefig('OUTPUT_NAME.pdf', bbox_inches='tight')
+plt.savefig('${name}.png', dpi=300, bbox_inches='tight')
+plt.savefig('${name}.pdf', bbox_inches='tight')
 print("Figure saved.")
 ''',
 }
 
 
+@functools.lru_cache(maxsize=None)
+def render_template(fig_type: str, name: str) -> str:
+    """Return the full script for a figure type, saving to name.png/.pdf."""
+    return Template(PREAMBLE + TEMPLATES[fig_type]).safe_substitute(name=name)
+
+
 def main():
     if "--list-types" in sys.argv:
         print("Available figure types:")
@@ -352,9 +362,9 @@ def main():
     parser.add_argument("--list-types", action="store_true")
     args = parser.parse_args()
 
-    script = TEMPLATES[args.type].replace("OUTPUT_NAME", args.name)
+    script = render_template(args.type, args.name)
 
-    with open(args.output, "w") as f:
+    with open(args.output, "w", encoding="utf-8") as f:
         f.write(script)
 
     print(f"Template written to {args.output}", file=sys.stderr)
@@ -13,48 +13,166 @@ Usage:
 """
 
 import argparse
+import gzip
+import hashlib
+import heapq
+import http.client
 import json
 import os
 import sys
+import threading
 import time
 import urllib.error
 import urllib.parse
 import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 
 
 S2_API_KEY = os.environ.get("SEMANTIC_SCHOLAR_API_KEY", "")
 S2_SEARCH_URL = "https://api.semanticscholar.org/graph/v1/paper/search"
-FIELDS = "title,authors,venue,year,abstract,citationCount"
+FIELDS = "paperId,title,authors,venue,year,abstract,citationCount"
+CACHE_DIR = os.path.expanduser("~/.cache/novelty_check")
+CACHE_TTL = 7 * 24 * 3600  # seconds before a cached search is fetched again
+MAX_REDIRECTS = 5
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+# http.client ignores proxy settings, so fall back to urllib when one is set
+USE_KEEPALIVE = not urllib.request.getproxies()
 
+_local = threading.local()
+
+# Filler words that end a key-phrase chunk in generate_search_queries()
+STOPWORDS = frozenset({
+    "with", "from", "that", "this", "using", "based", "through", "which",
+    "their", "have", "been", "into", "also", "more",
+})
+
+
+class SharedBackoff:
+    """Rate-limit pause shared by all search threads."""
+
+    def __init__(self):
+        self.until = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        delay = self.until - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def pause(self, seconds: float):
+        with self.lock:
+            self.until = max(self.until, time.monotonic() + seconds)
+
+
+# A 429 on any thread holds back every thread's next request
+BACKOFF = SharedBackoff()
+
+
+def get_connection(scheme: str, netloc: str, timeout: int) -> http.client.HTTPConnection:
+    """Return this thread's open connection to a host, creating it if needed."""
+    conns = _local.__dict__.setdefault("conns", {})
+    conn = conns.get((scheme, netloc))
+    if conn is None:
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        conn = conns[(scheme, netloc)] = cls(netloc, timeout=timeout)
+    return conn
+
+
+def http_get(url: str, headers: dict, timeout: int = 30) -> bytes:
+    """GET a URL over this thread's keep-alive connection, following redirects.
+
+    Asks for gzip and returns the decoded body.
+    Raises urllib.error.HTTPError for 4xx/5xx like urlopen().
+    """
+    headers = {**headers, "Accept-Encoding": "gzip"}
+    if not USE_KEEPALIVE:
+        req = urllib.request.Request(url, headers=headers)
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            body = resp.read()
+            return gzip.decompress(body) if resp.headers.get("Content-Encoding") == "gzip" else body
+
+    for _ in range(MAX_REDIRECTS + 1):
+        parts = urllib.parse.urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        conn = get_connection(parts.scheme, parts.netloc, timeout)
+        try:
+            conn.request("GET", path, headers=headers)
+            resp = conn.getresponse()
+        except (http.client.HTTPException, OSError):
+            # Server dropped the idle connection: reconnect once
+            conn.close()
+            conn.request("GET", path, headers=headers)
+            resp = conn.getresponse()
+        body = resp.read()
+
+        if resp.status in REDIRECT_CODES and resp.getheader("Location"):
+            url = urllib.parse.urljoin(url, resp.getheader("Location"))
+            continue
+        if resp.status >= 400:
+            conn.close()  # don't reuse a connection the server may be shedding
+            raise urllib.error.HTTPError(url, resp.status, resp.reason, resp.headers, None)
+        return gzip.decompress(body) if resp.getheader("Content-Encoding") == "gzip" else body
+
+    raise urllib.error.URLError(f"too many redirects for {url}")
+
+
+def search_semantic_scholar(query: str, limit: int = 10, use_cache: bool = True) -> list[dict]:
+    """Search Semantic Scholar for papers matching the query.
+
+    Successful responses are cached on disk under CACHE_DIR for CACHE_TTL,
+    keyed by query and limit, so re-running on the same idea skips the network.
+    """
+    cache_key = hashlib.sha1(f"{query}|{limit}".encode("utf-8")).hexdigest()
+    cache_path = os.path.join(CACHE_DIR, f"{cache_key}.json")
+    if use_cache:
+        try:
+            if time.time() - os.path.getmtime(cache_path) < CACHE_TTL:
+                with open(cache_path, encoding="utf-8") as f:
+                    return json.load(f)
+        except (OSError, ValueError):
+            pass
 
-def search_semantic_scholar(query: str, limit: int = 10) -> list[dict]:
-    """Search Semantic Scholar for papers matching the query."""
     params = urllib.parse.urlencode({
         "query": query,
         "limit": limit,
         "fields": FIELDS,
     })
     url = f"{S2_SEARCH_URL}?{params}"
-    req = urllib.request.Request(url)
+    headers = {"User-Agent": "SkillScript/1.0"}
     if S2_API_KEY:
-        req.add_header("X-API-KEY", S2_API_KEY)
+        headers["X-API-KEY"] = S2_API_KEY
 
     for attempt in range(3):
+        BACKOFF.wait()
         try:
-            with urllib.request.urlopen(req, timeout=30) as resp:
-                data = json.loads(resp.read().decode())
-                return data.get("data", [])
+            data = json.loads(http_get(url, headers, timeout=30))
+            papers = data.get("data", [])
+            break
         except urllib.error.HTTPError as e:
             if e.code == 429:
                 wait = 2 ** (attempt + 1)
                 print(f"  Rate limited, waiting {wait}s...", file=sys.stderr)
-                time.sleep(wait)
+                BACKOFF.pause(wait)
                 continue
             raise
-        except urllib.error.URLError:
+        except (urllib.error.URLError, http.client.HTTPException, OSError):
             time.sleep(2)
             continue
-    return []
+    else:
+        return []
+
+    if use_cache:
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            tmp_path = f"{cache_path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(papers, f)
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            print(f"  Cache write failed: {e}", file=sys.stderr)
+    return papers
 
 
 def format_paper(paper: dict) -> str:
@@ -91,7 +209,7 @@ def generate_search_queries(idea: str) -> list[str]:
     chunks = []
     current_chunk = []
     for word in idea.split():
-        if len(word) > 3 and not word.lower() in {"with", "from", "that", "this", "using", "based", "through", "which", "their", "have", "been", "into", "also", "more"}:
+        if len(word) > 3 and word.lower() not in STOPWORDS:
             current_chunk.append(word)
         else:
             if current_chunk:
@@ -109,9 +227,12 @@ def generate_search_queries(idea: str) -> list[str]:
     return queries[:5]
 
 
-def run_novelty_check(idea: str, max_rounds: int = 5, result_limit: int = 10) -> dict:
+def run_novelty_check(idea: str, max_rounds: int = 5, result_limit: int = 10,
+                      workers: int = 3, use_cache: bool = True) -> dict:
     """Run iterative novelty checking against Semantic Scholar.
 
+    Queued queries are searched concurrently (up to `workers` at a time)
+    while results are still reported round by round in queue order.
     Returns a dict with novelty assessment and similar papers found.
     """
     print(f"Checking novelty of idea:")
@@ -124,46 +245,57 @@ def run_novelty_check(idea: str, max_rounds: int = 5, result_limit: int = 10) ->
     # Generate initial search queries
     search_queries = generate_search_queries(idea)
 
-    for round_num in range(1, max_rounds + 1):
-        if not search_queries:
-            break
+    pending = {}  # query -> future
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for round_num in range(1, max_rounds + 1):
+            if not search_queries:
+                break
+
+            # Start every queued query the remaining rounds can reach
+            for q in search_queries[:max_rounds - round_num + 1]:
+                if q not in pending:
+                    pending[q] = executor.submit(search_semantic_scholar, q, result_limit, use_cache)
 
-        query = search_queries.pop(0)
-        queries_used.append(query)
-        print(f"Round {round_num}/{max_rounds}: Searching \"{query}\"")
+            query = search_queries.pop(0)
+            queries_used.append(query)
+            print(f"Round {round_num}/{max_rounds}: Searching \"{query}\"")
 
-        papers = search_semantic_scholar(query, limit=result_limit)
+            papers = pending.pop(query).result()
 
-        if not papers:
-            print("  No results found.")
+            if not papers:
+                print("  No results found.")
+                print()
+                continue
+
+            new_papers = 0
+            for paper in papers:
+                title = paper.get("title", "")
+                if not title:
+                    continue
+                # Same paper across queries, even if its title string differs
+                key = paper.get("paperId") or title
+                if key not in all_papers_seen:
+                    all_papers_seen[key] = paper
+                    new_papers += 1
+
+            print(f"  Found {len(papers)} papers ({new_papers} new)")
+            for paper in papers[:3]:
+                print(format_paper(paper))
+            if len(papers) > 3:
+                print(f"  ... and {len(papers) - 3} more")
             print()
-            continue
 
-        new_papers = 0
-        for paper in papers:
-            title = paper.get("title", "")
-            if title and title not in all_papers_seen:
-                all_papers_seen[title] = paper
-                new_papers += 1
-
-        print(f"  Found {len(papers)} papers ({new_papers} new)")
-        for paper in papers[:3]:
-            print(format_paper(paper))
-        if len(papers) > 3:
-            print(f"  ... and {len(papers) - 3} more")
-        print()
-
-        # If we got results, try to refine with more specific queries
-        if papers and round_num < max_rounds and not search_queries:
-            # Generate follow-up queries from the most relevant paper titles
-            for p in papers[:2]:
-                t = p.get("title", "")
-                if t and len(t.split()) >= 3:
-                    search_queries.append(t[:80])
-
-    # Rank by relevance (citation count as proxy)
-    ranked = sorted(all_papers_seen.values(),
-                    key=lambda p: p.get("citationCount", 0), reverse=True)
+            # If we got results, try to refine with more specific queries
+            if papers and round_num < max_rounds and not search_queries:
+                # Generate follow-up queries from the most relevant paper titles
+                for p in papers[:2]:
+                    t = p.get("title", "")
+                    if t and len(t.split()) >= 3:
+                        search_queries.append(t[:80])
+
+    # Rank by relevance (citation count as proxy); only the top 10 are reported
+    ranked = heapq.nlargest(10, all_papers_seen.values(),
+                            key=lambda p: p.get("citationCount", 0) or 0)
 
     result = {
         "idea": idea,
@@ -178,7 +310,7 @@ def run_novelty_check(idea: str, max_rounds: int = 5, result_limit: int = 10) ->
                 "citations": p.get("citationCount", 0),
                 "abstract": (p.get("abstract", "") or "")[:200],
             }
-            for p in ranked[:10]
+            for p in ranked
         ],
     }
 
@@ -205,6 +337,10 @@ def main():
     parser.add_argument("--idea-file", type=str, help="JSON file containing idea (must have 'Title' or 'Experiment' field)")
     parser.add_argument("--max-rounds", type=int, default=5, help="Max search rounds (default: 5)")
     parser.add_argument("--result-limit", type=int, default=10, help="Results per query (default: 10)")
+    parser.add_argument("--workers", type=int, default=3,
+                        help="Concurrent searches (default: 3)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help=f"Ignore cached Semantic Scholar responses in {CACHE_DIR}")
     parser.add_argument("--output", type=str, help="Output JSON file for results")
     args = parser.parse_args()
 
@@ -221,7 +357,8 @@ def main():
         return
 
     result = run_novelty_check(idea_text, max_rounds=args.max_rounds,
-                                result_limit=args.result_limit)
+                                result_limit=args.result_limit, workers=args.workers,
+                                use_cache=not args.no_cache)
 
     if args.output:
         with open(args.output, "w", encoding="utf-8") as f: